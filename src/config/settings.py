@@ -36,6 +36,30 @@ class Settings(BaseSettings):
         default="sqlite:///./data/metrics.db",
         description="Database connection URL"
     )
+    db_pool_size: int = Field(
+        default=10,
+        description="Number of pooled database connections"
+    )
+    db_max_overflow: int = Field(
+        default=20,
+        description="Extra connections allowed beyond the pool size"
+    )
+    db_pool_timeout: int = Field(
+        default=30,
+        description="Seconds to wait for a pooled connection"
+    )
+    db_pool_pre_ping: bool = Field(
+        default=False,
+        description="Health-check pooled connections on checkout (PostgreSQL)"
+    )
+    db_pool_recycle: int = Field(
+        default=1800,
+        description="Seconds before a pooled connection is recycled"
+    )
+    mcp_database_url: Optional[str] = Field(
+        default=None,
+        description="Separate database URL for MCP events (defaults to database_url)"
+    )
     
     # Dashboard Configuration
     dashboard_host: str = Field(default="0.0.0.0")
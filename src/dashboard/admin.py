@@ -41,20 +41,29 @@ def get_organizations():
 def get_users(org_id=None):
     """Get all users from database."""
     with get_db_session() as session:
-        query = session.query(User)
+        query = session.query(
+            User.id,
+            User.github_username,
+            User.name,
+            User.team,
+            User.copilot_enabled,
+            User.maturity_level,
+            User.is_weekly_active,
+            User.is_monthly_active
+        )
         if org_id:
             query = query.filter(User.organization_id == org_id)
-        users = query.all()
+        users = query.execution_options(stream_results=True).yield_per(2000)
         return [{
-            "id": u.id,
-            "github_username": u.github_username,
-            "name": u.name,
-            "team": u.team,
-            "copilot_enabled": u.copilot_enabled,
-            "maturity_level": u.maturity_level,
-            "is_weekly_active": u.is_weekly_active,
-            "is_monthly_active": u.is_monthly_active
-        } for u in users]
+            "id": uid,
+            "github_username": username,
+            "name": name,
+            "team": team,
+            "copilot_enabled": enabled,
+            "maturity_level": level,
+            "is_weekly_active": weekly,
+            "is_monthly_active": monthly
+        } for uid, username, name, team, enabled, level, weekly, monthly in users]
 
 
 def get_daily_metrics(org_id=None, limit=30):
@@ -5,7 +5,11 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timedelta
+import logging
 import sys
 import os
 
@@ -17,6 +21,12 @@ from src.database.connection import init_database, get_db_session
 from src.database.models import Organization, User, DailyMetrics
 from src.data_collectors.copilot_api import CopilotAPIClient
 
+# Route module loggers (metrics, collectors) to stderr once at startup
+logging.basicConfig(
+    level=settings.log_level,
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+
 # Page configuration
 st.set_page_config(
     page_title="AI Adoption Tracker",
@@ -228,13 +238,43 @@ def check_database_has_data():
         return False
 
 
+@st.cache_data(ttl=900, show_spinner=False)
 def get_metrics_data():
-    """Get metrics data from database."""
+    """Get metrics data from database.
+
+    Cached for 15 minutes and shared across sessions; every widget
+    interaction reruns the script, so this keeps reruns from re-querying
+    a database that changes at most hourly.
+    """
     try:
         with get_db_session() as session:
-            latest_obj = session.query(DailyMetrics).order_by(DailyMetrics.date.desc()).first()
-            
+            trend_objs = session.query(DailyMetrics).order_by(DailyMetrics.date).all()
+            trend = [{
+                'date': t.date,
+                'total_users': t.total_users,
+                'enabled_users': t.enabled_users,
+                'active_users': t.active_users,
+                'weekly_active_users': t.weekly_active_users,
+                'monthly_active_users': t.monthly_active_users,
+                'acceptance_rate': t.acceptance_rate,
+                'activation_rate': t.activation_rate,
+                'ai_assisted_commits': t.ai_assisted_commits,
+                'ai_assisted_prs': t.ai_assisted_prs,
+                'total_commits': t.total_commits,
+                'total_prs': t.total_prs,
+                'ai_code_retention_rate': t.ai_code_retention_rate,
+                'l0_count': t.l0_count,
+                'l1_count': t.l1_count,
+                'l2_count': t.l2_count,
+                'l3_count': t.l3_count,
+                'l4_count': t.l4_count,
+                'l5_count': t.l5_count,
+            } for t in trend_objs]
+
+            # The latest row is just the tail of the trend query, so reuse
+            # it instead of issuing a second ORDER BY ... DESC round-trip.
             latest = None
+            latest_obj = trend_objs[-1] if trend_objs else None
             if latest_obj:
                 latest = {
                     'date': latest_obj.date,
@@ -264,41 +304,28 @@ def get_metrics_data():
                     'l4_count': latest_obj.l4_count,
                     'l5_count': latest_obj.l5_count,
                 }
-            
-            trend_objs = session.query(DailyMetrics).order_by(DailyMetrics.date).all()
-            trend = [{
-                'date': t.date,
-                'total_users': t.total_users,
-                'enabled_users': t.enabled_users,
-                'active_users': t.active_users,
-                'weekly_active_users': t.weekly_active_users,
-                'monthly_active_users': t.monthly_active_users,
-                'acceptance_rate': t.acceptance_rate,
-                'activation_rate': t.activation_rate,
-                'ai_assisted_commits': t.ai_assisted_commits,
-                'ai_assisted_prs': t.ai_assisted_prs,
-                'total_commits': t.total_commits,
-                'total_prs': t.total_prs,
-                'ai_code_retention_rate': t.ai_code_retention_rate,
-                'l0_count': t.l0_count,
-                'l1_count': t.l1_count,
-                'l2_count': t.l2_count,
-                'l3_count': t.l3_count,
-                'l4_count': t.l4_count,
-                'l5_count': t.l5_count,
-            } for t in trend_objs]
-            
-            user_objs = session.query(User).all()
+
+            # Stream only the displayed columns instead of hydrating
+            # every User object into memory at once
+            user_rows = session.query(
+                User.github_username,
+                User.name,
+                User.team,
+                User.copilot_enabled,
+                User.maturity_level,
+                User.is_weekly_active,
+                User.is_monthly_active,
+            ).execution_options(stream_results=True).yield_per(2000)
             users = [{
-                'github_username': u.github_username,
-                'name': u.name,
-                'team': u.team,
-                'copilot_enabled': u.copilot_enabled,
-                'maturity_level': u.maturity_level,
-                'is_weekly_active': u.is_weekly_active,
-                'is_monthly_active': u.is_monthly_active,
-            } for u in user_objs]
-            
+                'github_username': username,
+                'name': name,
+                'team': team,
+                'copilot_enabled': enabled,
+                'maturity_level': level,
+                'is_weekly_active': weekly,
+                'is_monthly_active': monthly,
+            } for username, name, team, enabled, level, weekly, monthly in user_rows]
+
             return latest, trend, users
     except Exception as e:
         print(f"Error getting metrics: {e}")
@@ -401,26 +428,27 @@ def render_phase_progression(latest):
             """, unsafe_allow_html=True)
 
 
-def render_maturity_distribution(latest):
-    """Render maturity distribution."""
-    st.markdown("### 👥 Maturity Distribution")
-    
+@st.cache_data(show_spinner=False)
+def _build_maturity_fig(counts):
+    """Build the maturity distribution figure for a counts snapshot.
+
+    Cached per counts tuple so the bar text formatting and figure
+    construction run once per data snapshot, not on every rerun.
+    """
     levels = ['L0', 'L1', 'L2', 'L3', 'L4', 'L5']
-    counts = [latest['l0_count'], latest['l1_count'], latest['l2_count'], 
-              latest['l3_count'], latest['l4_count'], latest['l5_count']]
     colors = ['#ea4335', '#fbbc05', '#4285f4', '#34a853', '#0d652d', '#7627bb']
     total = sum(counts)
-    
+
     fig = go.Figure()
     fig.add_trace(go.Bar(
         y=levels,
-        x=counts,
+        x=list(counts),
         orientation='h',
         marker_color=colors,
         text=[f'{c} ({round(c/total*100)}%)' for c in counts],
         textposition='outside'
     ))
-    
+
     fig.update_layout(
         paper_bgcolor='rgba(0,0,0,0)',
         plot_bgcolor='rgba(0,0,0,0)',
@@ -430,7 +458,16 @@ def render_maturity_distribution(latest):
         xaxis=dict(showgrid=True, gridcolor='#e8eaed', zeroline=False),
         yaxis=dict(showgrid=False)
     )
-    
+    return fig
+
+
+def render_maturity_distribution(latest):
+    """Render maturity distribution."""
+    st.markdown("### 👥 Maturity Distribution")
+
+    fig = _build_maturity_fig((latest['l0_count'], latest['l1_count'], latest['l2_count'],
+                               latest['l3_count'], latest['l4_count'], latest['l5_count']))
+
     col1, col2 = st.columns([2, 1])
     
     with col1:
@@ -452,7 +489,7 @@ def render_maturity_distribution(latest):
         """, unsafe_allow_html=True)
 
 
-def render_adoption_tab(trend, latest):
+def render_adoption_tab(trend_df, latest):
     """Render adoption tab."""
     st.markdown("### 📊 Adoption Metrics")
     
@@ -466,8 +503,8 @@ def render_adoption_tab(trend, latest):
     with col4:
         st.metric("Enabled Users", latest['enabled_users'], f"/{latest['total_users']}")
     
-    if trend:
-        df = pd.DataFrame(trend)
+    if not trend_df.empty:
+        df = trend_df
         fig = make_subplots(specs=[[{"secondary_y": True}]])
         
         fig.add_trace(go.Scatter(x=df['date'], y=df['active_users'], name='Active Users', 
@@ -490,7 +527,7 @@ def render_adoption_tab(trend, latest):
         st.plotly_chart(fig, use_container_width=True)
 
 
-def render_productivity_tab(trend, latest):
+def render_productivity_tab(trend_df, latest):
     """Render productivity tab."""
     st.markdown("### ⚡ Productivity Metrics")
     
@@ -509,11 +546,11 @@ def render_productivity_tab(trend, latest):
     col1, col2 = st.columns(2)
     
     with col1:
-        if trend:
-            df = pd.DataFrame(trend)
+        if not trend_df.empty:
+            df = trend_df.assign(manual_commits=trend_df['total_commits'] - trend_df['ai_assisted_commits'])
             fig = go.Figure()
             fig.add_trace(go.Bar(x=df['date'], y=df['ai_assisted_commits'], name='AI Commits', marker_color='#4285f4'))
-            fig.add_trace(go.Bar(x=df['date'], y=[t['total_commits'] - t['ai_assisted_commits'] for t in trend], name='Manual Commits', marker_color='#e8eaed'))
+            fig.add_trace(go.Bar(x=df['date'], y=df['manual_commits'], name='Manual Commits', marker_color='#e8eaed'))
             
             fig.update_layout(title='AI vs Manual Commits', barmode='stack', paper_bgcolor='rgba(0,0,0,0)',
                             plot_bgcolor='rgba(0,0,0,0)', font=dict(family='Roboto'), height=350,
@@ -521,8 +558,8 @@ def render_productivity_tab(trend, latest):
             st.plotly_chart(fig, use_container_width=True)
     
     with col2:
-        if trend:
-            df = pd.DataFrame(trend)
+        if not trend_df.empty:
+            df = trend_df
             fig = go.Figure()
             fig.add_trace(go.Scatter(x=df['date'], y=df['acceptance_rate'], mode='lines+markers',
                                     name='Acceptance Rate', line=dict(color='#34a853', width=3),
@@ -534,7 +571,7 @@ def render_productivity_tab(trend, latest):
             st.plotly_chart(fig, use_container_width=True)
 
 
-def render_quality_tab(trend, latest):
+def render_quality_tab(trend_df, latest):
     """Render quality tab."""
     st.markdown("### 🎯 Code Quality Metrics")
     
@@ -549,8 +586,8 @@ def render_quality_tab(trend, latest):
     with col4:
         st.metric("Lines Modified", f"{latest['ai_code_modified']:,}", "After generation")
     
-    if trend:
-        df = pd.DataFrame(trend)
+    if not trend_df.empty:
+        df = trend_df
         fig = go.Figure()
         fig.add_trace(go.Scatter(x=df['date'], y=df['ai_code_retention_rate'], mode='lines+markers',
                                 name='Retention Rate', line=dict(color='#4285f4', width=3),
@@ -592,6 +629,16 @@ def render_quality_tab(trend, latest):
         """, unsafe_allow_html=True)
 
 
+@st.cache_data(show_spinner=False)
+def _to_arrow_table(display_df):
+    """Pre-serialize the display DataFrame to an Arrow table.
+
+    st.dataframe accepts Arrow tables directly, so caching the conversion
+    skips the per-rerun Arrow serialization of the user list.
+    """
+    return pa.Table.from_pandas(display_df, preserve_index=False)
+
+
 def render_users_tab(users):
     """Render users tab."""
     st.markdown("### 👤 User Details")
@@ -601,10 +648,16 @@ def render_users_tab(users):
         return
     
     df = pd.DataFrame(users)
-    
+    # Categorical/narrow dtypes turn the equality filters below into
+    # integer-code comparisons and shrink memory for large user lists.
+    df['team'] = df['team'].astype('category')
+    df['maturity_level'] = df['maturity_level'].astype('int8')
+    for flag in ('copilot_enabled', 'is_weekly_active', 'is_monthly_active'):
+        df[flag] = df[flag].astype(bool)
+
     col1, col2, col3 = st.columns(3)
     with col1:
-        team_filter = st.selectbox("Filter by Team", ["All"] + list(df['team'].unique()))
+        team_filter = st.selectbox("Filter by Team", ["All"] + list(df['team'].cat.categories))
     with col2:
         level_filter = st.selectbox("Filter by Level", ["All", "L0", "L1", "L2", "L3", "L4", "L5"])
     with col3:
@@ -624,15 +677,23 @@ def render_users_tab(users):
     
     st.markdown(f"**Showing {len(filtered_df)} of {len(df)} users**")
     
-    display_df = filtered_df.copy()
-    display_df['Level'] = display_df['maturity_level'].apply(lambda x: f'L{x}')
-    display_df['Status'] = display_df.apply(
-        lambda row: '🟢 Active' if row['is_weekly_active'] else ('🟡 Enabled' if row['copilot_enabled'] else '⚪ Not Enabled'), axis=1)
-    
-    display_df = display_df[['name', 'team', 'Level', 'Status', 'is_weekly_active', 'is_monthly_active']]
-    display_df.columns = ['Name', 'Team', 'Level', 'Status', 'Weekly Active', 'Monthly Active']
-    
-    st.dataframe(display_df, use_container_width=True, height=400)
+    display_df = filtered_df.assign(
+        Level='L' + filtered_df['maturity_level'].astype(str),
+        Status=np.select(
+            [filtered_df['is_weekly_active'], filtered_df['copilot_enabled']],
+            ['🟢 Active', '🟡 Enabled'],
+            default='⚪ Not Enabled'
+        )
+    )[['name', 'team', 'Level', 'Status', 'is_weekly_active', 'is_monthly_active']].rename(
+        columns={'name': 'Name', 'team': 'Team',
+                 'is_weekly_active': 'Weekly Active', 'is_monthly_active': 'Monthly Active'})
+    
+    st.dataframe(
+        _to_arrow_table(display_df),
+        use_container_width=True,
+        height=400,
+        column_config={'Status': st.column_config.TextColumn(width='small')}
+    )
 
 
 def render_footer():
@@ -645,29 +706,59 @@ def render_footer():
     """, unsafe_allow_html=True)
 
 
+def _classify_seat_levels(seats):
+    """Classify seat maturity levels in one vectorized pass.
+
+    Maps days since last activity onto levels entirely in NumPy
+    (<=1 day -> L4, <=7 -> L3, <=14 -> L2, older or never active -> L1)
+    instead of per-seat datetime arithmetic and branching.
+    """
+    times = np.array(
+        [np.datetime64(int(s.last_activity_at.timestamp()), 's') if s.last_activity_at else np.datetime64('NaT')
+         for s in seats],
+        dtype='datetime64[s]'
+    )
+    days_since = (np.datetime64('now') - times) / np.timedelta64(1, 'D')
+    return np.select([days_since <= 1, days_since <= 7, days_since <= 14], [4, 3, 2], default=1)
+
+
+@st.cache_resource
+def get_copilot_client():
+    """Get a shared Copilot API client (HTTP session reused across reruns)."""
+    return CopilotAPIClient()
+
+
+@st.cache_data(ttl=900, show_spinner="Fetching live Copilot metrics...")
 def fetch_live_data():
-    """Fetch live data from GitHub Copilot API."""
+    """Fetch live data from GitHub Copilot API.
+
+    Results are cached for 15 minutes and shared across sessions, since
+    Copilot metrics update at most daily.
+    """
     try:
-        client = CopilotAPIClient()
-        
+        client = get_copilot_client()
+
         # Test connection first
         conn_test = client.test_connection()
         if conn_test["status"] == "error":
             return None, None, None, conn_test["error"]
-        
-        # Get billing/seat info
-        billing = client.get_copilot_billing()
+
+        # Billing, usage and seats hit independent endpoints, so fetch
+        # them concurrently instead of serially; the slowest call (the
+        # paginated seat list) no longer gates the other two.
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            billing_future = executor.submit(client.get_copilot_billing)
+            usage_future = executor.submit(client.get_usage_summary, 28)
+            seats_future = executor.submit(client.get_all_copilot_seats)
+            billing = billing_future.result()
+            usage = usage_future.result()
+            seats = seats_future.result()
+
         seat_breakdown = billing.get("seat_breakdown", {})
         total_seats = seat_breakdown.get("total", 0)
         active_seats = seat_breakdown.get("active_this_cycle", 0)
         inactive_seats = seat_breakdown.get("inactive_this_cycle", 0)
         
-        # Get usage summary
-        usage = client.get_usage_summary(days=28)
-        
-        # Get all seats (users)
-        seats = client.get_all_copilot_seats()
-        
         # Build latest metrics dict
         acceptance_rate = usage.get("acceptance_rate", 0)
         activation_rate = round((active_seats / total_seats * 100) if total_seats > 0 else 0, 2)
@@ -715,35 +806,26 @@ def fetch_live_data():
         # Build trend data (single day for now)
         trend = [latest]
         
-        # Build users list from seats
-        users = []
-        for seat in seats:
-            # Determine maturity level based on activity
-            if seat.last_activity_at:
-                days_since_activity = (datetime.now(seat.last_activity_at.tzinfo) - seat.last_activity_at).days if seat.last_activity_at.tzinfo else (datetime.now() - seat.last_activity_at.replace(tzinfo=None)).days
-                if days_since_activity <= 1:
-                    level = 4
-                elif days_since_activity <= 7:
-                    level = 3
-                elif days_since_activity <= 14:
-                    level = 2
-                else:
-                    level = 1
-            else:
-                level = 1
-            
-            users.append({
-                'github_username': seat.login,
-                'name': seat.login,
-                'team': 'Unknown',
-                'copilot_enabled': True,
-                'maturity_level': level,
-                'is_weekly_active': level >= 3,
-                'is_monthly_active': level >= 2,
-                'last_activity': seat.last_activity_at.strftime('%Y-%m-%d') if seat.last_activity_at else 'Never',
-                'editor': seat.last_activity_editor or 'Unknown'
-            })
-        
+        # Build user columns from seats
+        levels = _classify_seat_levels(seats)
+
+        # Column-oriented (dict of lists) instead of one dict per seat:
+        # pd.DataFrame consumes this layout without building and hashing
+        # N row dicts.
+        logins = [s.login for s in seats]
+        users = {
+            'github_username': logins,
+            'name': logins,
+            'team': ['Unknown'] * len(seats),
+            'copilot_enabled': [True] * len(seats),
+            'maturity_level': levels.tolist(),
+            'is_weekly_active': (levels >= 3).tolist(),
+            'is_monthly_active': (levels >= 2).tolist(),
+            'last_activity': [s.last_activity_at.strftime('%Y-%m-%d') if s.last_activity_at else 'Never'
+                              for s in seats],
+            'editor': [s.last_activity_editor or 'Unknown' for s in seats],
+        }
+
         return latest, trend, users, None
     
     except Exception as e:
@@ -768,6 +850,9 @@ def render_data_source_selector():
                 st.markdown(f'<span class="pill-green">✓ Connected to {settings.github_org}</span>', unsafe_allow_html=True)
             else:
                 st.markdown('<span class="pill-red">⚠️ Missing credentials</span>', unsafe_allow_html=True)
+            if st.button("🔄 Force refresh"):
+                fetch_live_data.clear()
+                st.rerun()
     
     return "live" if "Live" in data_source else "demo"
 
@@ -809,6 +894,8 @@ def main():
     
     # Load data from database
     latest, trend, users = get_metrics_data()
+    # Convert the trend once; all tab renderers share this DataFrame
+    trend_df = pd.DataFrame(trend)
     
     if latest:
         st.success("✅ Data loaded from database")
@@ -825,11 +912,11 @@ def main():
         with tab1:
             render_maturity_distribution(latest)
         with tab2:
-            render_adoption_tab(trend, latest)
+            render_adoption_tab(trend_df, latest)
         with tab3:
-            render_productivity_tab(trend, latest)
+            render_productivity_tab(trend_df, latest)
         with tab4:
-            render_quality_tab(trend, latest)
+            render_quality_tab(trend_df, latest)
         with tab5:
             render_users_tab(users)
     
@@ -6,7 +6,18 @@ Fetches usage data from GitHub Copilot Metrics API.
 Reference: https://docs.github.com/en/rest/copilot
 """
 
+import asyncio
+import itertools
+import math
+import sys
+import time
+
 import requests
+import httpx
+import numpy as np
+import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, date, timedelta
 from typing import Optional, Dict, List, Any
 from dataclasses import dataclass
@@ -14,6 +25,17 @@ import json
 
 from ..config.settings import settings
 
+if sys.version_info >= (3, 11):
+    # fromisoformat parses the trailing "Z" natively on 3.11+, so the
+    # per-seat .replace("Z", "+00:00") allocation is unnecessary.
+    _parse_iso = datetime.fromisoformat
+else:
+    try:
+        from ciso8601 import parse_datetime as _parse_iso
+    except ImportError:
+        def _parse_iso(value: str) -> datetime:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
 
 @dataclass
 class CopilotUsageData:
@@ -50,20 +72,41 @@ class CopilotSeatInfo:
     created_at: datetime
     last_activity_at: Optional[datetime]
     last_activity_editor: Optional[str]
+
+
+@dataclass
+class SeatColumns:
+    """Columnar (structure-of-arrays) view of Copilot seat data.
+
+    One contiguous array per field instead of one Python object per
+    seat; never-active seats carry NaT in last_activity_at. Bulk
+    consumers (WAU/MAU scans, maturity classification) operate on
+    these arrays directly without per-object attribute access.
+    """
+    login: np.ndarray
+    created_at: np.ndarray          # datetime64[s]
+    last_activity_at: np.ndarray    # datetime64[s], NaT if never active
+    last_activity_editor: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.login)
     
 
 class CopilotAPIClient:
     """Client for GitHub Copilot Metrics API."""
     
-    def __init__(self, token: str = None, org: str = None):
+    def __init__(self, token: str = None, org: str = None, tokens: List[str] = None):
         """
         Initialize the Copilot API client.
         
         Args:
             token: GitHub Personal Access Token (defaults to settings)
             org: GitHub Organization name (defaults to settings)
+            tokens: Optional pool of tokens rotated per request to
+                multiply the effective rate limit
         """
-        self.token = token or settings.github_token
+        pool = [t for t in (tokens or []) if t]
+        self.token = (pool[0] if pool else None) or token or settings.github_token
         self.org = org or settings.github_org
         self.base_url = settings.github_api_url
         
@@ -77,21 +120,78 @@ class CopilotAPIClient:
             "Accept": "application/vnd.github+json",
             "X-GitHub-Api-Version": "2022-11-28"
         }
-    
+
+        # Reuse one pooled session so paginated calls share keep-alive
+        # connections instead of paying a TCP/TLS handshake per request.
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=5,
+                backoff_factor=0.5,
+                status_forcelist=[502, 503, 504],
+                allowed_methods=["GET"]
+            )
+        )
+        self._session.mount("https://", adapter)
+
+        # ETag cache per (endpoint, params): 304 replies don't count
+        # against the GitHub rate limit, so unchanged payloads are free.
+        self._etag_cache: Dict[Any, tuple] = {}
+
+        # Token pool: each request takes the next token, skipping ones
+        # close to their rate limit until the limit window resets.
+        self._tokens = pool or [self.token]
+        self._token_iter = itertools.cycle(self._tokens)
+        self._token_limits: Dict[str, tuple] = {}  # token -> (remaining, reset_epoch)
+
+    def _next_token(self) -> str:
+        """Pick the next pool token, skipping nearly exhausted ones."""
+        now = time.time()
+        for _ in range(len(self._tokens)):
+            candidate = next(self._token_iter)
+            remaining, reset = self._token_limits.get(candidate, (None, 0.0))
+            if remaining is None or remaining >= 50 or reset <= now:
+                return candidate
+        # Every token is near its limit; plain round-robin is all that's left
+        return next(self._token_iter)
+
     def _make_request(self, endpoint: str, method: str = "GET", params: Dict = None) -> Dict:
-        """Make API request to GitHub."""
+        """Make API request to GitHub, using conditional requests where possible."""
         url = f"{self.base_url}{endpoint}"
-        
+
+        cache_key = (endpoint, frozenset((params or {}).items()))
+        cached = self._etag_cache.get(cache_key) if method == "GET" else None
+        headers = {"If-None-Match": cached[0]} if cached else {}
+
+        token = self._next_token()
+        if len(self._tokens) > 1:
+            headers["Authorization"] = f"Bearer {token}"
+
         try:
-            response = requests.request(
+            response = self._session.request(
                 method=method,
                 url=url,
-                headers=self.headers,
                 params=params,
+                headers=headers or None,
                 timeout=30
             )
+            remaining = response.headers.get("X-RateLimit-Remaining")
+            if remaining is not None:
+                self._token_limits[token] = (
+                    int(remaining),
+                    float(response.headers.get("X-RateLimit-Reset", 0))
+                )
+            if response.status_code == 304 and cached:
+                return cached[1]
             response.raise_for_status()
-            return response.json()
+            data = response.json()
+            etag = response.headers.get("ETag")
+            if etag and method == "GET":
+                self._etag_cache[cache_key] = (etag, data)
+            return data
         except requests.exceptions.HTTPError as e:
             if response.status_code == 401:
                 raise Exception("Authentication failed. Check your GitHub token.")
@@ -137,30 +237,69 @@ class CopilotAPIClient:
             List of CopilotSeatInfo objects
         """
         all_seats = []
-        page = 1
-        
-        while True:
+
+        # total_seats on page 1 tells us the exact page count up front,
+        # so there is no trailing probe request for an empty page.
+        response = self.get_copilot_seats(page=1)
+        self._append_seats(all_seats, response.get("seats", []))
+
+        n_pages = math.ceil(response.get("total_seats", 0) / 100)
+        for page in range(2, n_pages + 1):
             response = self.get_copilot_seats(page=page)
-            seats = response.get("seats", [])
-            
-            if not seats:
-                break
-            
+            self._append_seats(all_seats, response.get("seats", []))
+
+        return all_seats
+
+    def get_all_copilot_seats_columnar(self) -> SeatColumns:
+        """
+        Get all Copilot seats as columnar arrays.
+
+        Parses the raw JSON in a single pass straight into field
+        lists, skipping CopilotSeatInfo object construction entirely.
+
+        Returns:
+            SeatColumns with one array per seat field
+        """
+        logins: List[str] = []
+        created: List[str] = []
+        last_active: List[str] = []
+        editors: List[str] = []
+
+        def collect(seats: List[Dict]):
             for seat in seats:
                 assignee = seat.get("assignee", {})
-                seat_info = CopilotSeatInfo(
-                    login=assignee.get("login", ""),
-                    created_at=datetime.fromisoformat(seat["created_at"].replace("Z", "+00:00")),
-                    last_activity_at=datetime.fromisoformat(seat["last_activity_at"].replace("Z", "+00:00")) if seat.get("last_activity_at") else None,
-                    last_activity_editor=seat.get("last_activity_editor")
-                )
-                all_seats.append(seat_info)
-            
-            if len(seats) < 100:
-                break
-            page += 1
-        
-        return all_seats
+                logins.append(assignee.get("login", ""))
+                created.append(seat.get("created_at", "").rstrip("Z") or "NaT")
+                last = seat.get("last_activity_at")
+                last_active.append(last.rstrip("Z") if last else "NaT")
+                editors.append(seat.get("last_activity_editor") or "")
+
+        response = self.get_copilot_seats(page=1)
+        collect(response.get("seats", []))
+
+        n_pages = math.ceil(response.get("total_seats", 0) / 100)
+        for page in range(2, n_pages + 1):
+            response = self.get_copilot_seats(page=page)
+            collect(response.get("seats", []))
+
+        return SeatColumns(
+            login=np.array(logins, dtype=object),
+            created_at=np.array(created, dtype="datetime64[s]"),
+            last_activity_at=np.array(last_active, dtype="datetime64[s]"),
+            last_activity_editor=np.array(editors, dtype=object)
+        )
+
+    @staticmethod
+    def _append_seats(all_seats: List[CopilotSeatInfo], seats: List[Dict]):
+        """Parse raw seat payloads into CopilotSeatInfo objects."""
+        for seat in seats:
+            assignee = seat.get("assignee", {})
+            all_seats.append(CopilotSeatInfo(
+                login=assignee.get("login", ""),
+                created_at=_parse_iso(seat["created_at"]),
+                last_activity_at=_parse_iso(seat["last_activity_at"]) if seat.get("last_activity_at") else None,
+                last_activity_editor=seat.get("last_activity_editor")
+            ))
     
     def get_copilot_usage(self, since: date = None, until: date = None) -> List[Dict]:
         """
@@ -210,42 +349,54 @@ class CopilotAPIClient:
                 "editor_breakdown": {}
             }
         
-        # Aggregate metrics
-        total_suggestions = sum(d.get("total_suggestions_count", 0) for d in usage_data)
-        total_acceptances = sum(d.get("total_acceptances_count", 0) for d in usage_data)
-        total_lines_suggested = sum(d.get("total_lines_suggested", 0) for d in usage_data)
-        total_lines_accepted = sum(d.get("total_lines_accepted", 0) for d in usage_data)
-        
+        # Aggregate daily totals in one vectorized pass
+        daily = pd.DataFrame(usage_data)
+        total_cols = ["total_suggestions_count", "total_acceptances_count",
+                      "total_lines_suggested", "total_lines_accepted",
+                      "total_active_users"]
+        for col in total_cols:
+            if col not in daily:
+                daily[col] = 0
+        daily[total_cols] = daily[total_cols].fillna(0)
+
+        totals = daily[total_cols].sum()
+        total_suggestions = int(totals["total_suggestions_count"])
+        total_acceptances = int(totals["total_acceptances_count"])
+        total_lines_suggested = int(totals["total_lines_suggested"])
+        total_lines_accepted = int(totals["total_lines_accepted"])
+
         # Get unique active users (this is approximate)
-        daily_active_users = [d.get("total_active_users", 0) for d in usage_data]
-        max_active_users = max(daily_active_users) if daily_active_users else 0
-        avg_daily_active = sum(daily_active_users) / len(daily_active_users) if daily_active_users else 0
-        
-        # Aggregate language breakdown
+        max_active_users = int(daily["total_active_users"].max())
+        avg_daily_active = float(daily["total_active_users"].mean())
+
+        # Aggregate language/editor breakdowns via groupby instead of
+        # nested dict-accumulation loops
         language_breakdown = {}
-        for day_data in usage_data:
-            for breakdown in day_data.get("breakdown", []):
-                lang = breakdown.get("language", "unknown")
-                if lang not in language_breakdown:
-                    language_breakdown[lang] = {
-                        "suggestions_shown": 0,
-                        "suggestions_accepted": 0,
-                        "lines_suggested": 0,
-                        "lines_accepted": 0
-                    }
-                language_breakdown[lang]["suggestions_shown"] += breakdown.get("suggestions_count", 0)
-                language_breakdown[lang]["suggestions_accepted"] += breakdown.get("acceptances_count", 0)
-                language_breakdown[lang]["lines_suggested"] += breakdown.get("lines_suggested", 0)
-                language_breakdown[lang]["lines_accepted"] += breakdown.get("lines_accepted", 0)
-        
-        # Aggregate editor breakdown
         editor_breakdown = {}
-        for day_data in usage_data:
-            for breakdown in day_data.get("breakdown", []):
-                editor = breakdown.get("editor", "unknown")
-                if editor not in editor_breakdown:
-                    editor_breakdown[editor] = {"active_users": 0}
-                editor_breakdown[editor]["active_users"] += breakdown.get("active_users", 0)
+        rows = [b for day_data in usage_data for b in day_data.get("breakdown", [])]
+        if rows:
+            bdf = pd.DataFrame(rows)
+            for col in ("suggestions_count", "acceptances_count",
+                        "lines_suggested", "lines_accepted", "active_users"):
+                if col not in bdf:
+                    bdf[col] = 0
+            for col in ("language", "editor"):
+                if col not in bdf:
+                    bdf[col] = "unknown"
+                else:
+                    bdf[col] = bdf[col].fillna("unknown")
+
+            lang_agg = bdf.groupby("language")[
+                ["suggestions_count", "acceptances_count", "lines_suggested", "lines_accepted"]
+            ].sum().astype(int)
+            lang_agg.columns = ["suggestions_shown", "suggestions_accepted",
+                                "lines_suggested", "lines_accepted"]
+            language_breakdown = lang_agg.to_dict("index")
+
+            editor_breakdown = {
+                editor: {"active_users": int(active)}
+                for editor, active in bdf.groupby("editor")["active_users"].sum().items()
+            }
         
         return {
             "period_days": days,
@@ -262,18 +413,68 @@ class CopilotAPIClient:
             "editor_breakdown": editor_breakdown
         }
     
+    def graphql(self, query: str, variables: Dict = None) -> Dict:
+        """
+        Execute a GraphQL query against the GitHub API.
+
+        One GraphQL request can batch what would otherwise be several
+        REST calls and only counts as a single rate-limit point.
+
+        Args:
+            query: GraphQL query string
+            variables: Query variables
+
+        Returns:
+            The "data" portion of the GraphQL response
+
+        Raises:
+            Exception: If the request or the query itself fails
+        """
+        try:
+            response = self._session.post(
+                "https://api.github.com/graphql",
+                json={"query": query, "variables": variables or {}},
+                timeout=30
+            )
+            response.raise_for_status()
+            payload = response.json()
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"GraphQL request failed: {str(e)}")
+
+        if payload.get("errors"):
+            messages = "; ".join(e.get("message", "unknown") for e in payload["errors"])
+            raise Exception(f"GraphQL query failed: {messages}")
+        return payload.get("data", {})
+
+    _CONNECTION_QUERY = """
+        query($org: String!) {
+            organization(login: $org) {
+                name
+                login
+                description
+            }
+        }
+    """
+
     def test_connection(self) -> Dict:
         """
         Test API connection and return organization info.
-        
+
+        Org info comes from a single GraphQL query instead of a
+        dedicated REST call; Copilot billing stays on REST since it is
+        not exposed via GraphQL.
+
         Returns:
             Dict with connection status and org info
         """
         try:
-            # Test basic org access
-            org_endpoint = f"/orgs/{self.org}"
-            org_info = self._make_request(org_endpoint)
-            
+            try:
+                data = self.graphql(self._CONNECTION_QUERY, {"org": self.org})
+                org_info = data.get("organization") or {}
+            except Exception:
+                # Tokens without GraphQL access fall back to REST
+                org_info = self._make_request(f"/orgs/{self.org}")
+
             # Test Copilot access
             billing_info = self.get_copilot_billing()
             
@@ -300,6 +501,142 @@ class CopilotAPIClient:
             }
 
 
+class AsyncCopilotAPIClient:
+    """Async client for GitHub Copilot Metrics API.
+
+    Fetches independent endpoints and seat pages concurrently: after the
+    first seats page reveals total_seats, the remaining pages are
+    requested in parallel instead of one at a time.
+    """
+
+    def __init__(self, token: str = None, org: str = None):
+        """
+        Initialize the async Copilot API client.
+
+        Args:
+            token: GitHub Personal Access Token (defaults to settings)
+            org: GitHub Organization name (defaults to settings)
+        """
+        self.token = token or settings.github_token
+        self.org = org or settings.github_org
+        self.base_url = settings.github_api_url
+
+        if not self.token:
+            raise ValueError("GitHub token is required. Set GITHUB_TOKEN in .env")
+        if not self.org:
+            raise ValueError("GitHub organization is required. Set GITHUB_ORG in .env")
+
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                "Authorization": f"Bearer {self.token}",
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28"
+            },
+            limits=httpx.Limits(max_connections=10),
+            timeout=30
+        )
+
+    async def __aenter__(self) -> "AsyncCopilotAPIClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Close the underlying HTTP client."""
+        await self._client.aclose()
+
+    async def _get(self, endpoint: str, params: Dict = None) -> Dict:
+        """Make an async GET request to GitHub."""
+        try:
+            response = await self._client.get(endpoint, params=params)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            if status == 401:
+                raise Exception("Authentication failed. Check your GitHub token.")
+            elif status == 403:
+                raise Exception("Access forbidden. Ensure token has 'copilot' and 'read:org' scopes.")
+            elif status == 404:
+                raise Exception(f"Endpoint not found or organization '{self.org}' doesn't exist.")
+            else:
+                raise Exception(f"API Error: {status} - {e.response.text}")
+        except httpx.HTTPError as e:
+            raise Exception(f"Request failed: {str(e)}")
+
+    @staticmethod
+    def _parse_seat(seat: Dict) -> CopilotSeatInfo:
+        """Parse a raw seat payload into CopilotSeatInfo."""
+        assignee = seat.get("assignee", {})
+        return CopilotSeatInfo(
+            login=assignee.get("login", ""),
+            created_at=_parse_iso(seat["created_at"]),
+            last_activity_at=_parse_iso(seat["last_activity_at"]) if seat.get("last_activity_at") else None,
+            last_activity_editor=seat.get("last_activity_editor")
+        )
+
+    async def get_all_copilot_seats(self) -> List[CopilotSeatInfo]:
+        """
+        Get all Copilot seats with concurrent pagination.
+
+        Returns:
+            List of CopilotSeatInfo objects
+        """
+        endpoint = f"/orgs/{self.org}/copilot/billing/seats"
+
+        first = await self._get(endpoint, params={"page": 1, "per_page": 100})
+        seats = [self._parse_seat(s) for s in first.get("seats", [])]
+
+        total = first.get("total_seats", len(seats))
+        n_pages = math.ceil(total / 100) if total else 1
+        if n_pages > 1:
+            pages = await asyncio.gather(*[
+                self._get(endpoint, params={"page": p, "per_page": 100})
+                for p in range(2, n_pages + 1)
+            ])
+            for page in pages:
+                seats.extend(self._parse_seat(s) for s in page.get("seats", []))
+
+        return seats
+
+    async def test_connection(self) -> Dict:
+        """
+        Test API connection, fetching org and billing info concurrently.
+
+        Returns:
+            Dict with connection status and org info
+        """
+        try:
+            org_info, billing_info = await asyncio.gather(
+                self._get(f"/orgs/{self.org}"),
+                self._get(f"/orgs/{self.org}/copilot/billing")
+            )
+
+            return {
+                "status": "success",
+                "organization": {
+                    "name": org_info.get("name", self.org),
+                    "login": org_info.get("login"),
+                    "description": org_info.get("description"),
+                    "public_repos": org_info.get("public_repos"),
+                    "total_private_repos": org_info.get("total_private_repos")
+                },
+                "copilot": {
+                    "seat_management_setting": billing_info.get("seat_management_setting"),
+                    "total_seats": billing_info.get("seat_breakdown", {}).get("total", 0),
+                    "active_seats": billing_info.get("seat_breakdown", {}).get("active_this_cycle", 0),
+                    "inactive_seats": billing_info.get("seat_breakdown", {}).get("inactive_this_cycle", 0)
+                }
+            }
+        except Exception as e:
+            return {
+                "status": "error",
+                "error": str(e)
+            }
+
+
 # Convenience function
 def get_copilot_client() -> CopilotAPIClient:
     """Get a configured Copilot API client."""
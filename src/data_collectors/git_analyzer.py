@@ -5,9 +5,14 @@ Git Repository Analyzer
 Analyzes Git repositories for code quality metrics and AI code tracking.
 """
 
+import hashlib
+import json
 import os
+import sqlite3
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, date, timedelta
-from typing import Optional, Dict, List, Any, Tuple
+from typing import Optional, Dict, Iterator, List, Literal, Any, Tuple
 from dataclasses import dataclass
 from pathlib import Path
 import re
@@ -82,7 +87,15 @@ class GitAnalyzer:
         r'tabnine',
         r'codewhisperer',
     ]
-    
+
+    # Pre-compiled alternation over all patterns: one scan per message
+    # instead of one scan per pattern. Named groups map each match back
+    # to the original pattern string for the indicators list.
+    _AI_COMMIT_RE = re.compile(
+        "|".join(f"(?P<g{i}>{p})" for i, p in enumerate(AI_COMMIT_PATTERNS)),
+        re.IGNORECASE
+    )
+
     def __init__(self, repo_path: str = None):
         """
         Initialize Git analyzer.
@@ -95,7 +108,8 @@ class GitAnalyzer:
         
         self.repo_path = repo_path
         self.repo = None
-        
+        self._classification_db = None
+
         if repo_path and os.path.exists(repo_path):
             self._load_repo(repo_path)
     
@@ -112,113 +126,302 @@ class GitAnalyzer:
     def set_repository(self, repo_path: str):
         """Set or change the repository to analyze."""
         self._load_repo(repo_path)
+
+    # Commits are immutable, so their classification can be persisted
+    # across runs: a daily re-analysis then only classifies commits
+    # added since the previous run.
+    _CLASSIFICATION_DB_PATH = Path("data") / "commit_classifications.db"
+
+    def _get_classification_db(self) -> Optional[sqlite3.Connection]:
+        """Open (lazily) the on-disk sha -> classification cache."""
+        if self._classification_db is None:
+            try:
+                self._CLASSIFICATION_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self._CLASSIFICATION_DB_PATH))
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS commit_classification ("
+                    "sha TEXT PRIMARY KEY, is_ai INTEGER, indicators TEXT)"
+                )
+                self._classification_db = conn
+            except Exception as e:
+                print(f"Error opening classification cache: {str(e)}")
+                self._classification_db = False
+        return self._classification_db or None
     
-    def _is_ai_assisted_commit(self, commit: Commit) -> Tuple[bool, List[str]]:
+    # Bounded scan-result cache keyed by a digest of the lowered
+    # message, so large commit bodies are never pinned in memory the
+    # way caching the strings themselves would.
+    _MESSAGE_CACHE_MAX = 4096
+    _message_cache: "OrderedDict[bytes, Tuple[bool, Tuple[str, ...]]]" = OrderedDict()
+
+    @classmethod
+    def _classify_message(cls, message_lower: str) -> Tuple[bool, Tuple[str, ...]]:
         """
-        Check if a commit appears to be AI-assisted.
-        
-        Args:
-            commit: Git commit object
-            
-        Returns:
-            Tuple of (is_ai_assisted, list of indicators found)
+        Classify a lowered commit message for AI-assistance indicators.
+
+        The full text is always scanned — co-authored-by trailers sit
+        at the end of long bodies — and results are cached so
+        histories full of identical auto-generated messages (merges,
+        bot commits, release tooling) are only scanned once.
         """
+        key = hashlib.blake2b(
+            message_lower.encode("utf-8", "replace"), digest_size=16
+        ).digest()
+        cached = cls._message_cache.get(key)
+        if cached is not None:
+            cls._message_cache.move_to_end(key)
+            return cached
+
         indicators = []
-        message = commit.message.lower()
-        
-        for pattern in self.AI_COMMIT_PATTERNS:
-            if re.search(pattern, message, re.IGNORECASE):
-                indicators.append(pattern)
-        
+
+        seen = set()
+        for match in cls._AI_COMMIT_RE.finditer(message_lower):
+            index = int(match.lastgroup[1:])
+            if index not in seen:
+                seen.add(index)
+                indicators.append(cls.AI_COMMIT_PATTERNS[index])
+
         # Check for co-authored-by patterns
-        if 'co-authored-by' in message and 'copilot' in message.lower():
+        if 'co-authored-by' in message_lower and 'copilot' in message_lower:
             indicators.append('co-authored-by-copilot')
-        
+
+        result = (len(indicators) > 0, tuple(indicators))
+        cls._message_cache[key] = result
+        if len(cls._message_cache) > cls._MESSAGE_CACHE_MAX:
+            cls._message_cache.popitem(last=False)
+        return result
+
+    def _classify_text(self, message: str, author_name: str = "") -> Tuple[bool, List[str]]:
+        """
+        Check if a commit message/author appears to be AI-assisted.
+
+        Args:
+            message: Commit message text
+            author_name: Commit author name
+
+        Returns:
+            Tuple of (is_ai_assisted, list of indicators found)
+        """
+        _, cached_indicators = self._classify_message(message.lower())
+        indicators = list(cached_indicators)
+
         # Check commit author (some tools add specific authors)
-        author_name = commit.author.name.lower() if commit.author else ""
+        author_name = author_name.lower()
         if 'copilot' in author_name or 'bot' in author_name:
             indicators.append('ai-author')
-        
+
         return len(indicators) > 0, indicators
+
+    def _is_ai_assisted_commit(self, commit: Commit) -> Tuple[bool, List[str]]:
+        """
+        Check if a commit appears to be AI-assisted.
+
+        Runs the pattern scan over commit.summary first; the full
+        message body (which GitPython decodes lazily and which can be
+        large for merge commits) is only read when no subject-line hit
+        was found and a co-authored-by trailer might still be present.
+
+        Args:
+            commit: Git commit object
+
+        Returns:
+            Tuple of (is_ai_assisted, list of indicators found)
+        """
+        author_name = commit.author.name if commit.author else ""
+        is_ai, indicators = self._classify_text(commit.summary, author_name)
+        if not is_ai:
+            # Trailers like Co-authored-by live in the body, not the
+            # subject, so this is the one case the full text is needed.
+            is_ai, indicators = self._classify_text(commit.message, author_name)
+        return is_ai, indicators
     
-    def get_commits(
-        self, 
-        since: date = None, 
+    # Matches "N files changed, X insertions(+), Y deletions(-)" with
+    # either count section optional.
+    _SHORTSTAT_RE = re.compile(
+        r"(\d+) files? changed(?:, (\d+) insertions?\(\+\))?(?:, (\d+) deletions?\(-\))?"
+    )
+
+    def iter_commits_info(
+        self,
+        since: date = None,
         until: date = None,
         branch: str = None,
-        max_count: int = None
-    ) -> List[CommitInfo]:
+        max_count: int = None,
+        detail: Literal["files", "totals"] = "files"
+    ) -> Iterator[CommitInfo]:
         """
-        Get commits from the repository.
-        
+        Stream commits from the repository lazily.
+
         Args:
             since: Start date
             until: End date
             branch: Branch name (defaults to active branch)
             max_count: Maximum number of commits to return
-            
-        Returns:
-            List of CommitInfo objects
+            detail: "files" parses --numstat per-file lines; "totals"
+                parses --shortstat, which skips per-file diff
+                enumeration when only aggregate counts are needed
+
+        Yields:
+            CommitInfo objects, one at a time
         """
         if not self.repo:
             raise ValueError("No repository loaded. Call set_repository() first.")
-        
-        commits = []
-        
-        # Build git log arguments
-        kwargs = {}
+
+        # One git log invocation with --numstat/--shortstat instead of
+        # per-commit commit.stats calls (each of which forks a diff
+        # subprocess). \x01 marks a commit record, \x1f separates header
+        # fields and \x02 ends the message so the stat block can follow.
+        stat_flag = "--shortstat" if detail == "totals" else "--numstat"
+        args = [stat_flag, "--pretty=format:%x01%H%x1f%an%x1f%ae%x1f%ct%x1f%B%x02"]
         if since:
-            kwargs['since'] = since.isoformat()
+            args.append(f"--since={since.isoformat()}")
         if until:
-            kwargs['until'] = until.isoformat()
+            args.append(f"--until={until.isoformat()}")
         if max_count:
-            kwargs['max_count'] = max_count
-        
+            args.append(f"--max-count={max_count}")
+
         # Get the branch
         if branch:
             ref = branch
         else:
             ref = self.repo.active_branch.name
-        
+
+        db = self._get_classification_db()
+        new_rows = []
+
         try:
-            for commit in self.repo.iter_commits(ref, **kwargs):
-                is_ai, indicators = self._is_ai_assisted_commit(commit)
-                
-                # Get stats
-                stats = commit.stats
-                
-                commit_info = CommitInfo(
-                    sha=commit.hexsha,
-                    author=commit.author.name if commit.author else "Unknown",
-                    author_email=commit.author.email if commit.author else "",
-                    date=datetime.fromtimestamp(commit.committed_date),
-                    message=commit.message.strip()[:200],  # Limit message length
-                    files_changed=stats.total.get('files', 0),
-                    insertions=stats.total.get('insertions', 0),
-                    deletions=stats.total.get('deletions', 0),
+            output = self.repo.git.log(ref, *args)
+            for record in output.split("\x01"):
+                if not record.strip():
+                    continue
+                header, _, stat_block = record.partition("\x02")
+                sha, author, email, timestamp, message = header.split("\x1f", 4)
+
+                files_changed = insertions = deletions = 0
+                if detail == "totals":
+                    match = self._SHORTSTAT_RE.search(stat_block)
+                    if match:
+                        files_changed = int(match.group(1))
+                        insertions = int(match.group(2) or 0)
+                        deletions = int(match.group(3) or 0)
+                else:
+                    for line in stat_block.splitlines():
+                        parts = line.split("\t")
+                        if len(parts) != 3:
+                            continue
+                        files_changed += 1
+                        if parts[0] != "-":
+                            insertions += int(parts[0])
+                        if parts[1] != "-":
+                            deletions += int(parts[1])
+
+                cached = db.execute(
+                    "SELECT is_ai, indicators FROM commit_classification WHERE sha = ?",
+                    (sha,)
+                ).fetchone() if db else None
+                if cached:
+                    is_ai, indicators = bool(cached[0]), json.loads(cached[1])
+                else:
+                    is_ai, indicators = self._classify_text(message, author)
+                    if db:
+                        new_rows.append((sha, int(is_ai), json.dumps(indicators)))
+
+                yield CommitInfo(
+                    sha=sha,
+                    author=author or "Unknown",
+                    author_email=email,
+                    date=datetime.fromtimestamp(int(timestamp)),
+                    message=message.strip()[:200],  # Limit message length
+                    files_changed=files_changed,
+                    insertions=insertions,
+                    deletions=deletions,
                     is_ai_assisted=is_ai,
                     ai_indicators=indicators
                 )
-                commits.append(commit_info)
         except Exception as e:
             print(f"Error iterating commits: {str(e)}")
-        
-        return commits
-    
+        finally:
+            # One transaction for all newly classified commits
+            if db and new_rows:
+                try:
+                    with db:
+                        db.executemany(
+                            "INSERT OR REPLACE INTO commit_classification "
+                            "(sha, is_ai, indicators) VALUES (?, ?, ?)",
+                            new_rows
+                        )
+                except Exception as e:
+                    print(f"Error persisting classification cache: {str(e)}")
+
+    def get_commits(
+        self,
+        since: date = None,
+        until: date = None,
+        branch: str = None,
+        max_count: int = None,
+        detail: Literal["files", "totals"] = "files"
+    ) -> List[CommitInfo]:
+        """
+        Get commits from the repository as a materialized list.
+
+        Use iter_commits_info() directly when a single streaming pass is
+        enough; this exists for callers that need random access.
+
+        Args:
+            since: Start date
+            until: End date
+            branch: Branch name (defaults to active branch)
+            max_count: Maximum number of commits to return
+
+        Returns:
+            List of CommitInfo objects
+        """
+        return list(self.iter_commits_info(
+            since=since, until=until, branch=branch, max_count=max_count,
+            detail=detail
+        ))
+
     def get_commit_stats(self, since: date = None, until: date = None) -> Dict:
         """
-        Get aggregated commit statistics.
-        
+        Get aggregated commit statistics in one streaming pass.
+
         Args:
             since: Start date
             until: End date
-            
+
         Returns:
             Dict with commit statistics
         """
-        commits = self.get_commits(since=since, until=until)
-        
-        if not commits:
+        total_commits = 0
+        ai_commit_count = 0
+        total_insertions = total_deletions = 0
+        ai_insertions = ai_deletions = 0
+        ai_authors = set()
+        commits_by_author = {}
+
+        for commit in self.iter_commits_info(since=since, until=until, detail="totals"):
+            total_commits += 1
+            total_insertions += commit.insertions
+            total_deletions += commit.deletions
+
+            by_author = commits_by_author.setdefault(commit.author, {
+                "total": 0,
+                "ai_assisted": 0,
+                "insertions": 0,
+                "deletions": 0
+            })
+            by_author["total"] += 1
+            by_author["insertions"] += commit.insertions
+            by_author["deletions"] += commit.deletions
+
+            if commit.is_ai_assisted:
+                ai_commit_count += 1
+                ai_insertions += commit.insertions
+                ai_deletions += commit.deletions
+                ai_authors.add(commit.author)
+                by_author["ai_assisted"] += 1
+
+        if total_commits == 0:
             return {
                 "total_commits": 0,
                 "ai_assisted_commits": 0,
@@ -229,36 +432,16 @@ class GitAnalyzer:
                 "ai_authors": [],
                 "commits_by_author": {}
             }
-        
-        ai_commits = [c for c in commits if c.is_ai_assisted]
-        authors = set(c.author for c in commits)
-        ai_authors = set(c.author for c in ai_commits)
-        
-        # Commits by author
-        commits_by_author = {}
-        for commit in commits:
-            if commit.author not in commits_by_author:
-                commits_by_author[commit.author] = {
-                    "total": 0,
-                    "ai_assisted": 0,
-                    "insertions": 0,
-                    "deletions": 0
-                }
-            commits_by_author[commit.author]["total"] += 1
-            commits_by_author[commit.author]["insertions"] += commit.insertions
-            commits_by_author[commit.author]["deletions"] += commit.deletions
-            if commit.is_ai_assisted:
-                commits_by_author[commit.author]["ai_assisted"] += 1
-        
+
         return {
-            "total_commits": len(commits),
-            "ai_assisted_commits": len(ai_commits),
-            "ai_percentage": round(len(ai_commits) / len(commits) * 100, 2) if commits else 0,
-            "total_insertions": sum(c.insertions for c in commits),
-            "total_deletions": sum(c.deletions for c in commits),
-            "ai_insertions": sum(c.insertions for c in ai_commits),
-            "ai_deletions": sum(c.deletions for c in ai_commits),
-            "unique_authors": len(authors),
+            "total_commits": total_commits,
+            "ai_assisted_commits": ai_commit_count,
+            "ai_percentage": round(ai_commit_count / total_commits * 100, 2),
+            "total_insertions": total_insertions,
+            "total_deletions": total_deletions,
+            "ai_insertions": ai_insertions,
+            "ai_deletions": ai_deletions,
+            "unique_authors": len(commits_by_author),
             "ai_authors": list(ai_authors),
             "commits_by_author": commits_by_author
         }
@@ -318,34 +501,76 @@ class GitAnalyzer:
             CodeQualityReport with analysis results
         """
         since_date = date.today() - timedelta(days=days)
-        commits = self.get_commits(since=since_date)
-        
-        ai_commits = [c for c in commits if c.is_ai_assisted]
-        
-        # Calculate total lines
-        total_lines = sum(c.insertions for c in commits)
-        ai_lines = sum(c.insertions for c in ai_commits)
-        
+
+        # Single streaming pass over the history; no commit list is
+        # materialized.
+        total_commits = ai_commit_count = 0
+        total_lines = ai_lines = 0
+        files_modified = ai_files_modified = 0
+        for commit in self.iter_commits_info(since=since_date, detail="totals"):
+            total_commits += 1
+            total_lines += commit.insertions
+            files_modified += commit.files_changed
+            if commit.is_ai_assisted:
+                ai_commit_count += 1
+                ai_lines += commit.insertions
+                ai_files_modified += commit.files_changed
+
         # Estimate modification rate (simplified)
         # In real implementation, this would track specific lines/files
         modification_rate = 0.0
-        if ai_commits and len(commits) > len(ai_commits):
+        if ai_commit_count and total_commits > ai_commit_count:
             # Rough estimate: if there are follow-up commits, some might be fixes
-            potential_fixes = len(commits) - len(ai_commits)
-            modification_rate = min(potential_fixes / len(ai_commits) * 10, 100)
-        
+            potential_fixes = total_commits - ai_commit_count
+            modification_rate = min(potential_fixes / ai_commit_count * 10, 100)
+
         return CodeQualityReport(
             repository=self.repo_path or "unknown",
             analysis_date=date.today(),
-            total_commits=len(commits),
-            ai_assisted_commits=len(ai_commits),
+            total_commits=total_commits,
+            ai_assisted_commits=ai_commit_count,
             total_lines_added=total_lines,
             ai_lines_added=ai_lines,
-            files_modified=sum(c.files_changed for c in commits),
-            ai_files_modified=sum(c.files_changed for c in ai_commits),
+            files_modified=files_modified,
+            ai_files_modified=ai_files_modified,
             modification_rate=round(modification_rate, 2)
         )
     
+    @staticmethod
+    def analyze_many(repo_paths: List[str], days: int = 30) -> List[CodeQualityReport]:
+        """
+        Analyze several repositories in parallel.
+
+        Each repository is analyzed in its own worker process, so the
+        git log parsing for N repos runs on N cores instead of serially.
+
+        Args:
+            repo_paths: Paths to the repositories to analyze
+            days: Number of days to analyze in each repository
+
+        Returns:
+            List of CodeQualityReport objects, one per repository,
+            in the same order as repo_paths
+        """
+        if not repo_paths:
+            return []
+        if len(repo_paths) == 1:
+            # Not worth the process spawn cost for a single repo
+            return [_analyze_one(repo_paths[0], days)]
+
+        max_workers = min(len(repo_paths), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_analyze_one, repo_paths, [days] * len(repo_paths)))
+
+    def head_sha(self) -> Optional[str]:
+        """Get the current HEAD commit sha, or None without a repo."""
+        if not self.repo:
+            return None
+        try:
+            return self.repo.head.commit.hexsha
+        except Exception:
+            return None
+    
     def get_repository_info(self) -> Dict:
         """Get basic repository information."""
         if not self.repo:
@@ -364,6 +589,11 @@ class GitAnalyzer:
             return {"error": str(e)}
 
 
+def _analyze_one(repo_path: str, days: int) -> CodeQualityReport:
+    """Analyze a single repository (top-level so it is picklable)."""
+    return GitAnalyzer(repo_path).analyze_code_quality(days=days)
+
+
 # Factory function
 def get_git_analyzer(repo_path: str = None) -> GitAnalyzer:
     """Get a Git analyzer instance."""
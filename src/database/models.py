@@ -7,7 +7,8 @@ SQLAlchemy models for storing metrics data.
 
 from datetime import datetime, date
 from typing import Optional
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Date, Boolean, Text, ForeignKey, JSON
+from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Date, Boolean, Text, ForeignKey, Index, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from sqlalchemy.pool import StaticPool
@@ -57,6 +58,11 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Incremental metric refreshes filter on updated_at
+        Index("ix_users_updated_at", "updated_at"),
+    )
+    
     # Relationships
     organization = relationship("Organization", back_populates="users")
     activity_logs = relationship("UserActivityLog", back_populates="user")
@@ -117,6 +123,10 @@ class DailyMetrics(Base):
     
     # Relationships
     organization = relationship("Organization", back_populates="daily_metrics")
+    
+    __table_args__ = (
+        Index("ix_daily_metrics_org_date", "organization_id", "date"),
+    )
 
 
 class UserActivityLog(Base):
@@ -147,6 +157,10 @@ class UserActivityLog(Base):
     
     # Relationships
     user = relationship("User", back_populates="activity_logs")
+    
+    __table_args__ = (
+        Index("ix_user_activity_user_date", "user_id", "date"),
+    )
 
 
 class MCPEvent(Base):
@@ -158,12 +172,22 @@ class MCPEvent(Base):
     github_username = Column(String(255))
     repository = Column(String(255))
     
-    # Event Details
-    event_data = Column(JSON)
+    # Event Details (JSONB on PostgreSQL: native driver encoding on
+    # the hot insert path and GIN-indexable for future queries)
+    event_data = Column(JSON().with_variant(JSONB, "postgresql"))
     
     # Timestamps
     event_timestamp = Column(DateTime, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # get_events filters on these columns and orders by timestamp, so
+    # each combination gets an index that covers the range scan.
+    __table_args__ = (
+        Index("ix_mcp_user_ts", "github_username", "event_timestamp"),
+        Index("ix_mcp_repo_ts", "repository", "event_timestamp"),
+        Index("ix_mcp_type_ts", "event_type", "event_timestamp"),
+        Index("ix_mcp_ts", "event_timestamp"),
+    )
 
 
 class CodeQualityMetric(Base):
@@ -186,6 +210,42 @@ class CodeQualityMetric(Base):
     modification_reason = Column(String(100))  # bug_fix, refactor, feature, etc.
     
     created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_quality_repo_mod_date", "repository", "modification_date"),
+        # Window aggregates filter on created_at and group or filter
+        # on is_ai_generated / modification_reason
+        Index("ix_cqm_created_reason", "created_at", "is_ai_generated", "modification_reason"),
+        # Per-repository quality rollups group by repository within a
+        # created_at range
+        Index("ix_cqm_repo_created", "repository", "created_at"),
+    )
+
+
+class DailyQualityBucket(Base):
+    """
+    Pre-aggregated per-day, per-repository quality counters.
+    
+    Maintained incrementally by the quality tracker's write path so
+    windowed rollups sum at most one row per day and repository
+    instead of scanning raw CodeQualityMetric rows.
+    """
+    __tablename__ = "daily_quality_buckets"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    date = Column(Date, nullable=False)
+    repository = Column(String(255), nullable=False)
+    
+    ai_lines = Column(Integer, default=0)
+    modified_lines = Column(Integer, default=0)
+    bug_fixes = Column(Integer, default=0)
+    files_tracked = Column(Integer, default=0)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_quality_bucket_date_repo", "date", "repository", unique=True),
+    )
 
 
 class KPI(Base):
@@ -5,16 +5,28 @@ MCP Event Tracker
 Tracks AI-assisted GitHub operations through Model Context Protocol.
 """
 
+import atexit
 import json
+import threading
 from datetime import datetime, date
 from typing import Optional, Dict, List, Any, Callable
 from dataclasses import dataclass, asdict
 from enum import Enum
 import asyncio
 
+from sqlalchemy import func, select
+
 from ..config.settings import settings
 from ..database.models import MCPEvent
-from ..database.connection import get_db_session
+from ..database.connection import mcp_session, mcp_read_session
+
+# Hot-path binding: pydantic settings attribute access runs validation
+# machinery that is not free at per-event frequency, and the flag is
+# process-static anyway.
+_ENABLE_MCP = settings.enable_mcp_tracking
+
+# Event types that count as file operations in rollups
+_FILE_OPS = frozenset({"file_create", "file_edit"})
 
 
 class MCPEventType(Enum):
@@ -61,11 +73,22 @@ class MCPEventTracker:
     Note: In a production environment, this would integrate with 
     an actual MCP server to receive real-time events.
     """
-    
+
+    # Buffered events are flushed as one bulk insert when either this
+    # many are pending or the flush timer fires, whichever comes first.
+    _FLUSH_THRESHOLD = 1000
+    _FLUSH_INTERVAL_SECONDS = 1.0
+
     def __init__(self):
         """Initialize MCP Event Tracker."""
-        self.enabled = settings.enable_mcp_tracking
+        self.enabled = _ENABLE_MCP
         self._event_handlers: List[Callable] = []
+        self._buffer: List[Dict] = []
+        self._buffer_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        atexit.register(self.flush)
     
     def register_handler(self, handler: Callable):
         """Register an event handler callback."""
@@ -109,25 +132,150 @@ class MCPEventTracker:
             details=details or {}
         )
         
-        # Save to database
-        try:
-            with get_db_session() as session:
-                db_event = MCPEvent(
-                    event_type=event.event_type,
-                    github_username=event.github_username,
-                    repository=event.repository,
-                    event_data=event.details,
-                    event_timestamp=event.timestamp
+        # Buffer for a batched insert instead of paying one DB
+        # round-trip and commit per event.
+        with self._buffer_lock:
+            self._buffer.append({
+                "event_type": event.event_type,
+                "github_username": event.github_username,
+                "repository": event.repository,
+                "event_data": event.details,
+                "event_timestamp": event.timestamp
+            })
+            flush_now = len(self._buffer) >= self._FLUSH_THRESHOLD
+            if not flush_now and self._flush_timer is None:
+                self._flush_timer = threading.Timer(
+                    self._FLUSH_INTERVAL_SECONDS, self.flush
                 )
-                session.add(db_event)
-        except Exception as e:
-            print(f"Error saving MCP event: {e}")
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        
+        if flush_now:
+            self.flush()
         
         # Notify handlers
         self._notify_handlers(event)
         
         return event
     
+    async def alog_event(
+        self,
+        event_type: MCPEventType,
+        github_username: str,
+        repository: str,
+        details: Dict[str, Any] = None
+    ) -> Optional[MCPEventData]:
+        """
+        Async variant of log_event for async endpoints.
+        
+        The request path only enqueues the event; a background task
+        drains the queue in batches off the event loop, so no request
+        awaits a database write.
+        
+        Args:
+            event_type: Type of event
+            github_username: GitHub username who triggered the event
+            repository: Repository where event occurred
+            details: Additional event details
+            
+        Returns:
+            MCPEventData object
+        """
+        if not self.enabled:
+            return None
+        
+        if self._queue is None:
+            await self.start_async_writer()
+        
+        event = MCPEventData(
+            event_type=event_type.value,
+            timestamp=datetime.utcnow(),
+            github_username=github_username,
+            repository=repository,
+            details=details or {}
+        )
+        
+        await self._queue.put({
+            "event_type": event.event_type,
+            "github_username": event.github_username,
+            "repository": event.repository,
+            "event_data": event.details,
+            "event_timestamp": event.timestamp
+        })
+        
+        self._notify_handlers(event)
+        
+        return event
+    
+    async def start_async_writer(self):
+        """Start the background task that drains queued events."""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._writer_task = asyncio.get_running_loop().create_task(
+                self._drain_queue()
+            )
+    
+    async def stop_async_writer(self):
+        """Stop the background writer, draining any queued events."""
+        if self._queue is not None:
+            await self._queue.put(None)
+            await self._writer_task
+            self._queue = None
+            self._writer_task = None
+    
+    _ASYNC_BATCH_SIZE = 500
+    
+    async def _drain_queue(self):
+        """Drain queued events into batched inserts off the event loop."""
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            
+            batch = [item]
+            stop = False
+            while len(batch) < self._ASYNC_BATCH_SIZE:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            
+            # The synchronous engine handles the actual write in a
+            # worker thread so the event loop never blocks on it
+            await asyncio.to_thread(self._write_batch, batch)
+            if stop:
+                return
+    
+    @staticmethod
+    def _write_batch(batch: List[Dict]):
+        """Bulk-insert one batch of queued event mappings."""
+        try:
+            with mcp_session() as session:
+                session.bulk_insert_mappings(MCPEvent, batch)
+        except Exception as e:
+            print(f"Error saving MCP events: {e}")
+    
+    def flush(self):
+        """Write all buffered events to the database in one bulk insert."""
+        with self._buffer_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            batch, self._buffer = self._buffer, []
+        
+        if not batch:
+            return
+        
+        try:
+            with mcp_session() as session:
+                session.bulk_insert_mappings(MCPEvent, batch)
+        except Exception as e:
+            print(f"Error saving MCP events: {e}")
+    
     def log_commit(
         self,
         github_username: str,
@@ -218,8 +366,9 @@ class MCPEventTracker:
         repository: str = None,
         since: datetime = None,
         until: datetime = None,
-        limit: int = 100
-    ) -> List[Dict]:
+        limit: int = 100,
+        stream: bool = False
+    ):
         """
         Query MCP events from database.
         
@@ -230,42 +379,80 @@ class MCPEventTracker:
             since: Start datetime
             until: End datetime
             limit: Maximum results
+            stream: When True, return a generator that yields event
+                dicts in server-side batches instead of materializing
+                the full result list (bounds memory for large limits)
             
         Returns:
-            List of event dictionaries
+            List of event dictionaries, or a generator when stream=True
         """
-        events = []
+        # Make sure buffered events are visible to the query
+        self.flush()
+        
+        if stream:
+            return self._iter_events(event_type, github_username, repository,
+                                     since, until, limit)
         
         try:
-            with get_db_session() as session:
-                query = session.query(MCPEvent)
-                
-                if event_type:
-                    query = query.filter(MCPEvent.event_type == event_type.value)
-                if github_username:
-                    query = query.filter(MCPEvent.github_username == github_username)
-                if repository:
-                    query = query.filter(MCPEvent.repository == repository)
-                if since:
-                    query = query.filter(MCPEvent.event_timestamp >= since)
-                if until:
-                    query = query.filter(MCPEvent.event_timestamp <= until)
-                
-                query = query.order_by(MCPEvent.event_timestamp.desc()).limit(limit)
-                
-                for event in query.all():
-                    events.append({
-                        "id": event.id,
-                        "event_type": event.event_type,
-                        "github_username": event.github_username,
-                        "repository": event.repository,
-                        "event_data": event.event_data,
-                        "timestamp": event.event_timestamp.isoformat()
-                    })
+            return list(self._iter_events(event_type, github_username, repository,
+                                          since, until, limit))
         except Exception as e:
             print(f"Error querying MCP events: {e}")
+            return []
+    
+    def _iter_events(
+        self,
+        event_type: MCPEventType = None,
+        github_username: str = None,
+        repository: str = None,
+        since: datetime = None,
+        until: datetime = None,
+        limit: int = 100
+    ):
+        """Yield event dicts in batches of 500 rows."""
+        # 2.0-style select() with a conditions list keeps the compiled
+        # statement cacheable across calls that differ only in
+        # parameter values, unlike chained legacy Query building.
+        conditions = []
+        if event_type:
+            conditions.append(MCPEvent.event_type == event_type.value)
+        if github_username:
+            conditions.append(MCPEvent.github_username == github_username)
+        if repository:
+            conditions.append(MCPEvent.repository == repository)
+        if since:
+            conditions.append(MCPEvent.event_timestamp >= since)
+        if until:
+            conditions.append(MCPEvent.event_timestamp <= until)
         
-        return events
+        # Column tuples instead of full ORM objects: only the six read
+        # attributes are fetched and no identity-map bookkeeping or
+        # object hydration happens per row.
+        stmt = (
+            select(
+                MCPEvent.id,
+                MCPEvent.event_type,
+                MCPEvent.github_username,
+                MCPEvent.repository,
+                MCPEvent.event_data,
+                MCPEvent.event_timestamp
+            )
+            .where(*conditions)
+            .order_by(MCPEvent.event_timestamp.desc())
+            .limit(limit)
+            .execution_options(stream_results=True, yield_per=500)
+        )
+        
+        with mcp_read_session() as session:
+            for event_id, etype, username, repo, data, timestamp in session.execute(stmt):
+                yield {
+                    "id": event_id,
+                    "event_type": etype,
+                    "github_username": username,
+                    "repository": repo,
+                    "event_data": data,
+                    "timestamp": timestamp.isoformat()
+                }
     
     def get_metrics(self, since: datetime = None, until: datetime = None) -> Dict:
         """
@@ -278,48 +465,57 @@ class MCPEventTracker:
         Returns:
             Dict with aggregated metrics
         """
-        events = self.get_events(since=since, until=until, limit=10000)
-        
-        if not events:
-            return {
-                "total_events": 0,
-                "ai_commits": 0,
-                "ai_pull_requests": 0,
-                "ai_branches": 0,
-                "ai_file_operations": 0,
-                "unique_users": 0,
-                "unique_repositories": 0,
-                "events_by_type": {},
-                "events_by_user": {},
-                "events_by_repo": {}
-            }
+        self.flush()
         
-        # Aggregate metrics
         events_by_type = {}
         events_by_user = {}
         events_by_repo = {}
+        total_events = 0
         
-        for event in events:
-            # By type
-            etype = event["event_type"]
-            events_by_type[etype] = events_by_type.get(etype, 0) + 1
-            
-            # By user
-            user = event["github_username"]
-            if user:
-                events_by_user[user] = events_by_user.get(user, 0) + 1
-            
-            # By repo
-            repo = event["repository"]
-            if repo:
-                events_by_repo[repo] = events_by_repo.get(repo, 0) + 1
+        # Aggregate in the database: three small GROUP BY result sets
+        # instead of transferring every event row into Python.
+        try:
+            with mcp_read_session() as session:
+                filters = []
+                if since:
+                    filters.append(MCPEvent.event_timestamp >= since)
+                if until:
+                    filters.append(MCPEvent.event_timestamp <= until)
+                
+                type_counts = (
+                    session.query(MCPEvent.event_type, func.count())
+                    .filter(*filters)
+                    .group_by(MCPEvent.event_type)
+                    .all()
+                )
+                user_counts = (
+                    session.query(MCPEvent.github_username, func.count())
+                    .filter(*filters)
+                    .filter(MCPEvent.github_username.isnot(None))
+                    .group_by(MCPEvent.github_username)
+                    .all()
+                )
+                repo_counts = (
+                    session.query(MCPEvent.repository, func.count())
+                    .filter(*filters)
+                    .filter(MCPEvent.repository.isnot(None))
+                    .group_by(MCPEvent.repository)
+                    .all()
+                )
+                
+                events_by_type = dict(type_counts)
+                events_by_user = {u: c for u, c in user_counts if u}
+                events_by_repo = {r: c for r, c in repo_counts if r}
+                total_events = sum(events_by_type.values())
+        except Exception as e:
+            print(f"Error aggregating MCP metrics: {e}")
         
         return {
-            "total_events": len(events),
+            "total_events": total_events,
             "ai_commits": events_by_type.get("commit", 0),
             "ai_pull_requests": events_by_type.get("pull_request", 0),
             "ai_branches": events_by_type.get("branch", 0),
-            "ai_file_operations": events_by_type.get("file_create", 0) + events_by_type.get("file_edit", 0),
+            "ai_file_operations": sum(events_by_type.get(t, 0) for t in _FILE_OPS),
             "unique_users": len(events_by_user),
             "unique_repositories": len(events_by_repo),
             "events_by_type": events_by_type,
@@ -341,41 +537,129 @@ class MCPEventTracker:
         from datetime import timedelta
         since = datetime.utcnow() - timedelta(days=days)
         
-        events = self.get_events(github_username=github_username, since=since, limit=1000)
+        self.flush()
         
         activity = {
             "username": github_username,
             "period_days": days,
-            "total_events": len(events),
+            "total_events": 0,
             "commits": 0,
             "pull_requests": 0,
             "file_operations": 0,
-            "repositories": set(),
+            "repositories": [],
             "daily_activity": {}
         }
         
-        for event in events:
-            etype = event["event_type"]
-            
-            if etype == "commit":
-                activity["commits"] += 1
-            elif etype == "pull_request":
-                activity["pull_requests"] += 1
-            elif etype in ["file_create", "file_edit"]:
-                activity["file_operations"] += 1
-            
-            if event["repository"]:
-                activity["repositories"].add(event["repository"])
+        # Push the tallies to the database: per-type counts, per-day
+        # counts and the distinct repository list come back as three
+        # small indexed-range-scan results instead of 1000 raw rows.
+        try:
+            with mcp_read_session() as session:
+                filters = [
+                    MCPEvent.github_username == github_username,
+                    MCPEvent.event_timestamp >= since
+                ]
+                
+                type_counts = dict(
+                    session.query(MCPEvent.event_type, func.count())
+                    .filter(*filters)
+                    .group_by(MCPEvent.event_type)
+                    .all()
+                )
+                daily_counts = (
+                    session.query(func.date(MCPEvent.event_timestamp), func.count())
+                    .filter(*filters)
+                    .group_by(func.date(MCPEvent.event_timestamp))
+                    .all()
+                )
+                repositories = [
+                    repo for (repo,) in
+                    session.query(func.distinct(MCPEvent.repository))
+                    .filter(*filters)
+                    .filter(MCPEvent.repository.isnot(None))
+                    .all()
+                ]
+                
+                activity["total_events"] = sum(type_counts.values())
+                activity["commits"] = type_counts.get("commit", 0)
+                activity["pull_requests"] = type_counts.get("pull_request", 0)
+                activity["file_operations"] = sum(
+                    type_counts.get(t, 0) for t in _FILE_OPS
+                )
+                activity["repositories"] = repositories
+                activity["daily_activity"] = {
+                    str(day): count for day, count in daily_counts
+                }
+        except Exception as e:
+            print(f"Error querying user activity: {e}")
+        
+        return activity
+    
+    def get_users_activity_bulk(
+        self,
+        usernames: List[str],
+        days: int = 30
+    ) -> Dict[str, Dict]:
+        """
+        Get MCP activity for many users in one round-trip.
+        
+        A single GROUP BY (user, event_type) query replaces the
+        per-user calls to get_user_activity, so the cost no longer
+        scales with the number of users.
+        
+        Args:
+            usernames: GitHub usernames to include
+            days: Number of days to look back
             
-            # Daily breakdown
-            event_date = event["timestamp"][:10]  # YYYY-MM-DD
-            if event_date not in activity["daily_activity"]:
-                activity["daily_activity"][event_date] = 0
-            activity["daily_activity"][event_date] += 1
+        Returns:
+            Dict mapping username to its activity counters
+        """
+        from datetime import timedelta
+        since = datetime.utcnow() - timedelta(days=days)
         
-        activity["repositories"] = list(activity["repositories"])
+        self.flush()
         
-        return activity
+        activities = {
+            username: {
+                "total_events": 0,
+                "commits": 0,
+                "pull_requests": 0,
+                "file_operations": 0
+            }
+            for username in usernames
+        }
+        if not usernames:
+            return activities
+        
+        try:
+            with mcp_read_session() as session:
+                rows = (
+                    session.query(
+                        MCPEvent.github_username,
+                        MCPEvent.event_type,
+                        func.count()
+                    )
+                    .filter(
+                        MCPEvent.github_username.in_(usernames),
+                        MCPEvent.event_timestamp >= since
+                    )
+                    .group_by(MCPEvent.github_username, MCPEvent.event_type)
+                    .all()
+                )
+                
+                for username, event_type, count in rows:
+                    activity = activities[username]
+                    activity["total_events"] += count
+                    if event_type == "commit":
+                        activity["commits"] += count
+                    elif event_type == "pull_request":
+                        activity["pull_requests"] += count
+                    elif event_type in _FILE_OPS:
+                        activity["file_operations"] += count
+        except Exception as e:
+            print(f"Error querying bulk user activity: {e}")
+        
+        return activities
 
 
 # Singleton instance
@@ -6,8 +6,12 @@ Configuration for connecting to GitHub MCP Server.
 Reference: https://github.com/github/github-mcp-server
 """
 
+import copy
+import hashlib
 import json
 import os
+import time
+from functools import lru_cache
 from typing import Dict, Optional
 from pathlib import Path
 
@@ -31,14 +35,19 @@ GITHUB_MCP_CONFIG = {
 }
 
 
+@lru_cache(maxsize=1)
 def get_mcp_config() -> Dict:
     """
     Get MCP server configuration for GitHub.
     
+    Cached for the process lifetime since the token is static; the
+    deep copy keeps the injected token out of the module-level
+    template (a shallow .copy() shared the nested env dict).
+    
     Returns:
         Dict with MCP configuration
     """
-    config = GITHUB_MCP_CONFIG.copy()
+    config = copy.deepcopy(GITHUB_MCP_CONFIG)
     config["mcpServers"]["github"]["env"]["GITHUB_PERSONAL_ACCESS_TOKEN"] = settings.github_token
     return config
 
@@ -47,6 +56,9 @@ def generate_mcp_config_file(output_path: str = None) -> str:
     """
     Generate MCP configuration file for VS Code/Cursor.
     
+    Skips the write when the serialized config is unchanged, using a
+    content hash stored in a sidecar file next to the config.
+    
     Args:
         output_path: Path to save config file (defaults to .vscode/mcp.json)
         
@@ -57,12 +69,19 @@ def generate_mcp_config_file(output_path: str = None) -> str:
         output_path = ".vscode/mcp.json"
     
     config = get_mcp_config()
+    payload = json.dumps(config, indent=2).encode()
+    digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+    
+    sidecar = Path(f"{output_path}.sha")
+    if sidecar.exists() and sidecar.read_text().strip() == digest and os.path.exists(output_path):
+        return output_path
     
     # Create directory if needed
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
     
-    with open(output_path, 'w') as f:
-        json.dump(config, f, indent=2)
+    with open(output_path, 'wb') as f:
+        f.write(payload)
+    sidecar.write_text(digest)
     
     print(f"✅ MCP config generated at: {output_path}")
     return output_path
@@ -132,10 +151,24 @@ def get_mcp_tools_info() -> Dict:
 class MCPServerManager:
     """Manager for MCP server lifecycle and monitoring."""
     
+    # How long a config-file existence check stays valid before the
+    # next status lookup re-stats the path.
+    _CHECK_TTL_SECONDS = 30.0
+    
     def __init__(self):
         """Initialize MCP Server Manager."""
         self.config_path = ".vscode/mcp.json"
-        self.is_configured = self._check_config()
+        self._checked_at = 0.0
+        self._is_configured = False
+    
+    @property
+    def is_configured(self) -> bool:
+        """Whether the MCP config file exists (memoized with a TTL)."""
+        now = time.monotonic()
+        if now - self._checked_at > self._CHECK_TTL_SECONDS:
+            self._is_configured = self._check_config()
+            self._checked_at = now
+        return self._is_configured
     
     def _check_config(self) -> bool:
         """Check if MCP server is configured."""
@@ -156,7 +189,8 @@ class MCPServerManager:
         
         try:
             config_file = generate_mcp_config_file(self.config_path)
-            self.is_configured = True
+            self._is_configured = True
+            self._checked_at = time.monotonic()
             
             return {
                 "status": "success",
@@ -190,6 +224,7 @@ class MCPServerManager:
 
 
 # Export
+@lru_cache(maxsize=1)
 def get_mcp_manager() -> MCPServerManager:
-    """Get MCP server manager instance."""
+    """Get the MCP server manager singleton."""
     return MCPServerManager()
@@ -5,6 +5,13 @@ Productivity Metrics Calculator
 Calculates productivity-related metrics from AI-assisted development.
 """
 
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timedelta
 from typing import Dict, List, Optional
 from dataclasses import dataclass
@@ -12,11 +19,13 @@ from dataclasses import dataclass
 from ..data_collectors.copilot_api import CopilotAPIClient
 from ..data_collectors.git_analyzer import GitAnalyzer
 from ..mcp.event_tracker import MCPEventTracker, MCPEventType
-from ..database.models import DailyMetrics, UserActivityLog
+from ..database.models import DailyMetrics, User, UserActivityLog
 from ..database.connection import get_db_session
 
+logger = logging.getLogger(__name__)
+
 
-@dataclass
+@dataclass(slots=True)
 class ProductivityMetrics:
     """Productivity metrics data class."""
     date: date
@@ -45,6 +54,34 @@ class ProductivityMetrics:
     total_loc_added: int
     ai_loc_added: int
     ai_loc_percentage: float
+    
+    def to_dict(self) -> Dict:
+        """
+        Serialize for JSON/display boundaries.
+        
+        Rates are rounded here, once, so the computation paths can
+        carry raw floats.
+        """
+        return {
+            "date": self.date.isoformat(),
+            "period_days": self.period_days,
+            "total_suggestions": self.total_suggestions,
+            "accepted_suggestions": self.accepted_suggestions,
+            "acceptance_rate": round(self.acceptance_rate, 2),
+            "total_lines_suggested": self.total_lines_suggested,
+            "lines_accepted": self.lines_accepted,
+            "lines_acceptance_rate": round(self.lines_acceptance_rate, 2),
+            "ai_assisted_commits": self.ai_assisted_commits,
+            "ai_assisted_prs": self.ai_assisted_prs,
+            "ai_file_operations": self.ai_file_operations,
+            "total_commits": self.total_commits,
+            "total_prs": self.total_prs,
+            "ai_commit_percentage": round(self.ai_commit_percentage, 2),
+            "ai_pr_percentage": round(self.ai_pr_percentage, 2),
+            "total_loc_added": self.total_loc_added,
+            "ai_loc_added": self.ai_loc_added,
+            "ai_loc_percentage": round(self.ai_loc_percentage, 2)
+        }
 
 
 class ProductivityMetricsCalculator:
@@ -67,17 +104,55 @@ class ProductivityMetricsCalculator:
         self.copilot_client = copilot_client
         self.git_analyzer = git_analyzer
         self.mcp_tracker = mcp_tracker
+        self._cache: Dict = {}
+        self._cache_hits = 0
+        self._cache_misses = 0
+    
+    # Seconds a cached metrics result stays valid; dashboard widgets
+    # rendered within one window share a single backend fetch.
+    _CACHE_TTL = 120
+    
+    def _cached(self, key, compute):
+        """Return the cached value for key, recomputing after the TTL."""
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry and now - entry[0] < self._CACHE_TTL:
+            self._cache_hits += 1
+            return entry[1]
+        self._cache_misses += 1
+        value = compute()
+        self._cache[key] = (now, value)
+        return value
+    
+    def cache_stats(self) -> Dict:
+        """Get hit/miss counters for the metrics cache."""
+        return {
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "size": len(self._cache),
+            "ttl_seconds": self._CACHE_TTL
+        }
     
     def get_productivity_metrics(self, days: int = 7) -> ProductivityMetrics:
         """
         Get productivity metrics for the specified period.
         
+        Results are memoized for a short TTL so repeated widget
+        renders don't refetch the API, MCP and git sources.
+        
         Args:
             days: Number of days to analyze
             
         Returns:
             ProductivityMetrics object
         """
+        return self._cached(
+            ("productivity", days, date.today()),
+            lambda: self._compute_productivity_metrics(days)
+        )
+    
+    def _compute_productivity_metrics(self, days: int) -> ProductivityMetrics:
+        """Compute productivity metrics from all configured sources."""
         since_date = date.today() - timedelta(days=days)
         since_datetime = datetime.combine(since_date, datetime.min.time())
         
@@ -102,65 +177,83 @@ class ProductivityMetricsCalculator:
             ai_loc_percentage=0.0
         )
         
-        # Get Copilot usage data
-        if self.copilot_client:
-            try:
-                usage = self.copilot_client.get_usage_summary(days=days)
-                
-                metrics.total_suggestions = usage.get("total_suggestions", 0)
-                metrics.accepted_suggestions = usage.get("total_acceptances", 0)
-                metrics.acceptance_rate = usage.get("acceptance_rate", 0.0)
-                metrics.total_lines_suggested = usage.get("total_lines_suggested", 0)
-                metrics.lines_accepted = usage.get("total_lines_accepted", 0)
-                metrics.lines_acceptance_rate = usage.get("lines_acceptance_rate", 0.0)
-                
-                # Estimate AI LOC from accepted lines
-                metrics.ai_loc_added = metrics.lines_accepted
-                
-            except Exception as e:
-                print(f"Error fetching Copilot usage: {e}")
-        
-        # Get MCP metrics
-        if self.mcp_tracker:
-            try:
-                mcp_metrics = self.mcp_tracker.get_metrics(since=since_datetime)
-                
-                metrics.ai_assisted_commits = mcp_metrics.get("ai_commits", 0)
-                metrics.ai_assisted_prs = mcp_metrics.get("ai_pull_requests", 0)
-                metrics.ai_file_operations = mcp_metrics.get("ai_file_operations", 0)
-                
-            except Exception as e:
-                print(f"Error fetching MCP metrics: {e}")
-        
-        # Get Git metrics
-        if self.git_analyzer:
-            try:
-                git_stats = self.git_analyzer.get_commit_stats(since=since_date)
-                
-                metrics.total_commits = git_stats.get("total_commits", 0)
-                metrics.total_loc_added = git_stats.get("total_insertions", 0)
-                
-                # AI commits from git analysis
-                ai_commits_git = git_stats.get("ai_assisted_commits", 0)
-                metrics.ai_assisted_commits = max(metrics.ai_assisted_commits, ai_commits_git)
-                
-            except Exception as e:
-                print(f"Error fetching Git stats: {e}")
+        # The three sources (Copilot API, MCP database, local git) are
+        # independent, so fetch them concurrently; each result is
+        # consumed with its own error handling to keep partial-failure
+        # behavior identical to the sequential version.
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            usage_future = (
+                executor.submit(self.copilot_client.get_usage_summary, days)
+                if self.copilot_client else None
+            )
+            mcp_future = (
+                executor.submit(self.mcp_tracker.get_metrics, since_datetime)
+                if self.mcp_tracker else None
+            )
+            git_future = (
+                executor.submit(self.git_analyzer.get_commit_stats, since_date)
+                if self.git_analyzer else None
+            )
+            
+            # Get Copilot usage data
+            if usage_future:
+                try:
+                    usage = usage_future.result()
+                    
+                    metrics.total_suggestions = usage.get("total_suggestions", 0)
+                    metrics.accepted_suggestions = usage.get("total_acceptances", 0)
+                    metrics.acceptance_rate = usage.get("acceptance_rate", 0.0)
+                    metrics.total_lines_suggested = usage.get("total_lines_suggested", 0)
+                    metrics.lines_accepted = usage.get("total_lines_accepted", 0)
+                    metrics.lines_acceptance_rate = usage.get("lines_acceptance_rate", 0.0)
+                    
+                    # Estimate AI LOC from accepted lines
+                    metrics.ai_loc_added = metrics.lines_accepted
+                    
+                except Exception as e:
+                    logger.exception("Error fetching Copilot usage")
+            
+            # Get MCP metrics
+            if mcp_future:
+                try:
+                    mcp_metrics = mcp_future.result()
+                    
+                    metrics.ai_assisted_commits = mcp_metrics.get("ai_commits", 0)
+                    metrics.ai_assisted_prs = mcp_metrics.get("ai_pull_requests", 0)
+                    metrics.ai_file_operations = mcp_metrics.get("ai_file_operations", 0)
+                    
+                except Exception as e:
+                    logger.exception("Error fetching MCP metrics")
+            
+            # Get Git metrics
+            if git_future:
+                try:
+                    git_stats = git_future.result()
+                    
+                    metrics.total_commits = git_stats.get("total_commits", 0)
+                    metrics.total_loc_added = git_stats.get("total_insertions", 0)
+                    
+                    # AI commits from git analysis
+                    ai_commits_git = git_stats.get("ai_assisted_commits", 0)
+                    metrics.ai_assisted_commits = max(metrics.ai_assisted_commits, ai_commits_git)
+                    
+                except Exception as e:
+                    logger.exception("Error fetching Git stats")
         
-        # Calculate percentages
+        # Calculate percentages; rounding happens once in to_dict
         if metrics.total_commits > 0:
-            metrics.ai_commit_percentage = round(
-                (metrics.ai_assisted_commits / metrics.total_commits) * 100, 2
+            metrics.ai_commit_percentage = (
+                metrics.ai_assisted_commits / metrics.total_commits * 100
             )
         
         if metrics.total_prs > 0:
-            metrics.ai_pr_percentage = round(
-                (metrics.ai_assisted_prs / metrics.total_prs) * 100, 2
+            metrics.ai_pr_percentage = (
+                metrics.ai_assisted_prs / metrics.total_prs * 100
             )
         
         if metrics.total_loc_added > 0:
-            metrics.ai_loc_percentage = round(
-                (metrics.ai_loc_added / metrics.total_loc_added) * 100, 2
+            metrics.ai_loc_percentage = (
+                metrics.ai_loc_added / metrics.total_loc_added * 100
             )
         
         return metrics
@@ -193,9 +286,11 @@ class ProductivityMetricsCalculator:
                         }
                     users[username]["total_events"] = count
                 
-                # Get detailed per-user activity
-                for username in list(users.keys()):
-                    activity = self.mcp_tracker.get_user_activity(username, days=days)
+                # Get detailed per-user activity in one bulk query
+                activities = self.mcp_tracker.get_users_activity_bulk(
+                    list(users.keys()), days=days
+                )
+                for username, activity in activities.items():
                     users[username].update({
                         "commits": activity.get("commits", 0),
                         "prs": activity.get("pull_requests", 0),
@@ -203,33 +298,42 @@ class ProductivityMetricsCalculator:
                     })
                     
             except Exception as e:
-                print(f"Error fetching user MCP data: {e}")
+                logger.exception("Error fetching user MCP data")
         
         # Supplement from database
         try:
             with get_db_session() as session:
                 since_date = date.today() - timedelta(days=days)
                 
-                activity_logs = session.query(UserActivityLog).filter(
-                    UserActivityLog.date >= since_date
-                ).all()
+                # One grouped query keyed on username instead of
+                # loading every activity row and its user relationship
+                rows = (
+                    session.query(
+                        User.github_username,
+                        func.sum(UserActivityLog.commits_count),
+                        func.sum(UserActivityLog.prs_created)
+                    )
+                    .join(User, User.id == UserActivityLog.user_id)
+                    .filter(UserActivityLog.date >= since_date)
+                    .group_by(User.github_username)
+                    .all()
+                )
                 
-                for log in activity_logs:
-                    user = log.user
-                    if user and user.github_username:
-                        username = user.github_username
-                        if username not in users:
-                            users[username] = {
-                                "total_events": 0,
-                                "commits": 0,
-                                "prs": 0,
-                                "file_ops": 0
-                            }
-                        users[username]["commits"] += log.commits_count
-                        users[username]["prs"] += log.prs_created
-                        
+                for username, commits, prs in rows:
+                    if not username:
+                        continue
+                    if username not in users:
+                        users[username] = {
+                            "total_events": 0,
+                            "commits": 0,
+                            "prs": 0,
+                            "file_ops": 0
+                        }
+                    users[username]["commits"] += int(commits or 0)
+                    users[username]["prs"] += int(prs or 0)
+                    
         except Exception as e:
-            print(f"Error fetching user database data: {e}")
+            logger.exception("Error fetching user database data")
         
         return users
     
@@ -249,23 +353,26 @@ class ProductivityMetricsCalculator:
             with get_db_session() as session:
                 since_date = date.today() - timedelta(days=days)
                 
-                daily_metrics = session.query(DailyMetrics).filter(
+                # Columnar fetch plus one vectorized records conversion
+                # instead of a per-row dict build over ORM instances.
+                query = session.query(
+                    DailyMetrics.date,
+                    DailyMetrics.total_suggestions_shown.label("suggestions_shown"),
+                    DailyMetrics.total_suggestions_accepted.label("suggestions_accepted"),
+                    DailyMetrics.acceptance_rate,
+                    DailyMetrics.ai_assisted_commits.label("ai_commits"),
+                    DailyMetrics.total_commits,
+                    DailyMetrics.ai_assisted_prs.label("ai_prs"),
+                    DailyMetrics.total_prs
+                ).filter(
                     DailyMetrics.date >= since_date
-                ).order_by(DailyMetrics.date).all()
+                ).order_by(DailyMetrics.date)
                 
-                for dm in daily_metrics:
-                    trend.append({
-                        "date": dm.date.isoformat(),
-                        "suggestions_shown": dm.total_suggestions_shown,
-                        "suggestions_accepted": dm.total_suggestions_accepted,
-                        "acceptance_rate": dm.acceptance_rate,
-                        "ai_commits": dm.ai_assisted_commits,
-                        "total_commits": dm.total_commits,
-                        "ai_prs": dm.ai_assisted_prs,
-                        "total_prs": dm.total_prs
-                    })
+                df = pd.read_sql(query.statement, session.bind)
+                df["date"] = df["date"].astype(str)
+                trend = df.to_dict(orient="records")
         except Exception as e:
-            print(f"Error fetching productivity trend: {e}")
+            logger.exception("Error fetching productivity trend")
         
         return trend
     
@@ -279,28 +386,43 @@ class ProductivityMetricsCalculator:
         Returns:
             Dict with language-level metrics
         """
+        return self._cached(
+            ("language", days, date.today()),
+            lambda: self._compute_language_productivity(days)
+        )
+    
+    def _compute_language_productivity(self, days: int) -> Dict[str, Dict]:
+        """Compute the per-language breakdown from the usage summary."""
         languages = {}
         
         if self.copilot_client:
             try:
                 usage = self.copilot_client.get_usage_summary(days=days)
+                breakdown = usage.get("language_breakdown", {})
                 
-                for lang, data in usage.get("language_breakdown", {}).items():
-                    suggestions = data.get("suggestions_shown", 0)
-                    accepted = data.get("suggestions_accepted", 0)
-                    
-                    languages[lang] = {
-                        "suggestions_shown": suggestions,
-                        "suggestions_accepted": accepted,
-                        "acceptance_rate": round(
-                            (accepted / suggestions * 100) if suggestions > 0 else 0, 2
-                        ),
-                        "lines_suggested": data.get("lines_suggested", 0),
-                        "lines_accepted": data.get("lines_accepted", 0)
-                    }
+                if breakdown:
+                    # One vectorized pass over all languages instead of
+                    # a Python-level division per entry
+                    df = pd.DataFrame.from_dict(breakdown, orient="index")
+                    df = df.reindex(
+                        columns=[
+                            "suggestions_shown",
+                            "suggestions_accepted",
+                            "lines_suggested",
+                            "lines_accepted"
+                        ],
+                        fill_value=0
+                    ).fillna(0).astype("int64")
+                    shown = df["suggestions_shown"]
+                    df["acceptance_rate"] = np.where(
+                        shown > 0,
+                        df["suggestions_accepted"] / shown.where(shown > 0, 1) * 100,
+                        0.0
+                    ).round(2)
+                    languages = df.to_dict(orient="index")
                     
             except Exception as e:
-                print(f"Error fetching language productivity: {e}")
+                logger.exception("Error fetching language productivity")
         
         return languages
     
@@ -317,7 +439,7 @@ class ProductivityMetricsCalculator:
             "acceptance_rate": {
                 "name": "Code Acceptance Rate",
                 "target": 30.0,
-                "current": metrics.acceptance_rate,
+                "current": round(metrics.acceptance_rate, 2),
                 "achieved": metrics.acceptance_rate >= 30.0,
                 "unit": "%",
                 "description": "Percentage of Copilot suggestions accepted"
@@ -325,7 +447,7 @@ class ProductivityMetricsCalculator:
             "ai_commit_rate": {
                 "name": "AI-Assisted Commit Rate",
                 "target": 20.0,
-                "current": metrics.ai_commit_percentage,
+                "current": round(metrics.ai_commit_percentage, 2),
                 "achieved": metrics.ai_commit_percentage >= 20.0,
                 "unit": "%",
                 "description": "Percentage of commits with AI assistance"
@@ -333,7 +455,7 @@ class ProductivityMetricsCalculator:
             "ai_loc_rate": {
                 "name": "AI-Generated LOC Rate",
                 "target": 25.0,
-                "current": metrics.ai_loc_percentage,
+                "current": round(metrics.ai_loc_percentage, 2),
                 "achieved": metrics.ai_loc_percentage >= 25.0,
                 "unit": "%",
                 "description": "Percentage of code lines generated by AI"
@@ -5,16 +5,81 @@ Quality Metrics Calculator
 Calculates code quality metrics for AI-generated code.
 """
 
+import atexit
+import logging
+import operator
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, date, timedelta
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+from sqlalchemy import case, func
+
 from ..data_collectors.git_analyzer import GitAnalyzer, CodeQualityReport
-from ..database.models import CodeQualityMetric, DailyMetrics
+from ..database.models import CodeQualityMetric, DailyMetrics, DailyQualityBucket
 from ..database.connection import get_db_session
 
+logger = logging.getLogger(__name__)
+
+
+# KOI definitions: everything here is constant per release; only the
+# current value and achieved flag are filled in per call.
+_KOI_SPEC = (
+    {
+        "key": "code_retention_rate",
+        "name": "Code Retention Rate",
+        "attr": "code_retention_rate",
+        "target": 85.0,
+        "op": operator.ge,
+        "unit": "%",
+        "description": "Percentage of AI code that remains unchanged"
+    },
+    {
+        "key": "modification_rate",
+        "name": "Modification Rate",
+        "attr": "modification_rate",
+        "target": 15.0,  # Lower is better
+        "op": operator.le,
+        "unit": "%",
+        "description": "Percentage of AI code requiring changes (lower is better)"
+    },
+    {
+        "key": "bug_rate",
+        "name": "Bug Rate",
+        "attr": "bug_rate",
+        "target": 5.0,  # Lower is better
+        "op": operator.le,
+        "unit": "per 1K LOC",
+        "description": "Bugs per 1000 lines of AI code (lower is better)"
+    },
+    {
+        "key": "pr_success_rate",
+        "name": "PR Success Rate",
+        "attr": "pr_rejection_rate",
+        "invert": True,  # success is the complement of rejection
+        "target": 90.0,
+        "op": operator.ge,
+        "unit": "%",
+        "description": "Percentage of AI PRs merged successfully"
+    },
+)
+
+
+def _pct_bp(numerator: int, denominator: int) -> int:
+    """
+    Percentage in basis points (hundredths of a percent), computed
+    with integer arithmetic and half-up rounding. Divide by 100 at the
+    serialization boundary for the usual two-decimal percentage.
+    """
+    if denominator == 0:
+        return 0
+    return (numerator * 10000 + denominator // 2) // denominator
 
-@dataclass
+
+@dataclass(slots=True)
 class QualityMetrics:
     """Quality metrics data class."""
     date: date
@@ -36,12 +101,7 @@ class QualityMetrics:
     
     # PR Quality
     ai_prs_total: int
-    ai_prs_rejected: int
     pr_rejection_rate: float
-    
-    # Review Feedback
-    avg_review_comments_ai: float
-    avg_review_comments_manual: float
 
 
 class QualityMetricsCalculator:
@@ -58,6 +118,9 @@ class QualityMetricsCalculator:
         "other": "Other"
     }
     
+    # Frozen key set for membership checks in tally loops
+    _VALID_REASONS = frozenset(MODIFICATION_REASONS)
+    
     def __init__(self, git_analyzer: GitAnalyzer = None):
         """
         Initialize quality metrics calculator.
@@ -66,17 +129,76 @@ class QualityMetricsCalculator:
             git_analyzer: Git repository analyzer
         """
         self.git_analyzer = git_analyzer
+        self._cache: Dict = {}
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._buffer: List[Dict] = []
+        self._buffer_lock = threading.Lock()
+        self._git_cache: Dict = {}
+        atexit.register(self.flush)
+    
+    # Buffered modifications are written as one bulk insert once this
+    # many are pending (or on flush/interpreter exit).
+    _FLUSH_THRESHOLD = 100
+    
+    # Seconds a git quality report stays cached for an unchanged HEAD
+    _GIT_CACHE_TTL = 300
+    
+    # Seconds a cached metrics result stays valid; dashboard widgets
+    # rendered within one window share a single backend fetch.
+    _CACHE_TTL = 60
+    
+    def _cached(self, key, compute):
+        """Return the cached value for key, recomputing after the TTL."""
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry and now - entry[0] < self._CACHE_TTL:
+            self._cache_hits += 1
+            return entry[1]
+        self._cache_misses += 1
+        value = compute()
+        self._cache[key] = (now, value)
+        return value
+    
+    def cache_stats(self) -> Dict:
+        """Get hit/miss counters for the metrics cache."""
+        return {
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "size": len(self._cache),
+            "ttl_seconds": self._CACHE_TTL
+        }
+    
+    @contextmanager
+    def _session_scope(self, session=None):
+        """Yield the caller's session, or open one for this scope."""
+        if session is not None:
+            yield session
+        else:
+            with get_db_session() as owned:
+                yield owned
     
     def get_quality_metrics(self, days: int = 30) -> QualityMetrics:
         """
         Get quality metrics for the specified period.
         
+        Results are memoized for a short TTL so repeated KOI panels
+        don't re-run the git analysis and aggregate queries; tracking
+        a new modification invalidates the cache.
+        
         Args:
             days: Number of days to analyze
             
         Returns:
             QualityMetrics object
         """
+        return self._cached(
+            ("quality", days, date.today()),
+            lambda: self._compute_quality_metrics(days)
+        )
+    
+    def _compute_quality_metrics(self, days: int) -> QualityMetrics:
+        """Compute quality metrics from git analysis and the database."""
         metrics = QualityMetrics(
             date=date.today(),
             period_days=days,
@@ -89,72 +211,108 @@ class QualityMetricsCalculator:
             ai_code_bugs=0,
             bug_rate=0.0,
             ai_prs_total=0,
-            ai_prs_rejected=0,
-            pr_rejection_rate=0.0,
-            avg_review_comments_ai=0.0,
-            avg_review_comments_manual=0.0
+            pr_rejection_rate=0.0
         )
         
-        # Get from Git analyzer
-        if self.git_analyzer:
-            try:
-                quality_report = self.git_analyzer.analyze_code_quality(days=days)
-                
-                metrics.ai_code_lines_total = quality_report.ai_lines_added
-                metrics.modification_rate = quality_report.modification_rate
-                
-                # Estimate unchanged lines
-                estimated_modified = int(metrics.ai_code_lines_total * (metrics.modification_rate / 100))
-                metrics.ai_code_modified = estimated_modified
-                metrics.ai_code_lines_unchanged = metrics.ai_code_lines_total - estimated_modified
-                
-                if metrics.ai_code_lines_total > 0:
-                    metrics.code_retention_rate = round(
-                        (metrics.ai_code_lines_unchanged / metrics.ai_code_lines_total) * 100, 2
-                    )
-                    
-            except Exception as e:
-                print(f"Error analyzing Git quality: {e}")
+        self.flush()
         
-        # Get from database
-        try:
-            with get_db_session() as session:
-                since_date = date.today() - timedelta(days=days)
-                
-                # Get quality metrics from database
-                quality_records = session.query(CodeQualityMetric).filter(
-                    CodeQualityMetric.created_at >= since_date
-                ).all()
-                
-                if quality_records:
-                    total_ai_lines = sum(r.ai_lines_original for r in quality_records)
-                    total_modified = sum(r.lines_modified for r in quality_records)
+        # The git analysis and the database aggregates are independent
+        # sources, so run them concurrently; each result keeps its own
+        # error handling so partial failures degrade the same way as
+        # the sequential version.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            git_future = (
+                executor.submit(self._analyze_git_quality, days)
+                if self.git_analyzer else None
+            )
+            db_future = executor.submit(self._fetch_quality_aggregates, days)
+            
+            if git_future:
+                try:
+                    quality_report = git_future.result()
                     
-                    # Bug fixes
-                    bug_fixes = [r for r in quality_records if r.modification_reason == "bug_fix"]
-                    metrics.ai_code_bugs = len(bug_fixes)
+                    metrics.ai_code_lines_total = quality_report.ai_lines_added
+                    metrics.modification_rate = quality_report.modification_rate
                     
-                    if total_ai_lines > 0:
-                        metrics.bug_rate = round((metrics.ai_code_bugs / total_ai_lines) * 1000, 2)
+                    # Estimate unchanged lines
+                    estimated_modified = int(metrics.ai_code_lines_total * (metrics.modification_rate / 100))
+                    metrics.ai_code_modified = estimated_modified
+                    metrics.ai_code_lines_unchanged = metrics.ai_code_lines_total - estimated_modified
                     
-                    # Average days to modification
-                    days_list = [r.days_until_modification for r in quality_records if r.days_until_modification]
-                    if days_list:
-                        metrics.avg_days_to_modification = round(sum(days_list) / len(days_list), 1)
+                    if metrics.ai_code_lines_total > 0:
+                        metrics.code_retention_rate = _pct_bp(
+                            metrics.ai_code_lines_unchanged, metrics.ai_code_lines_total
+                        ) / 100
+                        
+                except Exception as e:
+                    logger.exception("Error analyzing Git quality")
+            
+            try:
+                total_ai_lines, bug_fixes, avg_days, ai_prs_total = db_future.result()
                 
-                # Get daily metrics for PR info
-                daily_metrics = session.query(DailyMetrics).filter(
-                    DailyMetrics.date >= since_date
-                ).all()
+                metrics.ai_code_bugs = bug_fixes
+                if total_ai_lines > 0:
+                    metrics.bug_rate = round((metrics.ai_code_bugs / total_ai_lines) * 1000, 2)
+                if avg_days is not None:
+                    metrics.avg_days_to_modification = round(float(avg_days), 1)
+                metrics.ai_prs_total = ai_prs_total
                 
-                if daily_metrics:
-                    metrics.ai_prs_total = sum(dm.ai_assisted_prs for dm in daily_metrics)
-                    
-        except Exception as e:
-            print(f"Error fetching quality data from database: {e}")
+            except Exception as e:
+                logger.exception("Error fetching quality data from database")
         
         return metrics
     
+    def _analyze_git_quality(self, days: int) -> CodeQualityReport:
+        """
+        Analyze git quality, memoized per (HEAD sha, days).
+        
+        The history walk only produces a new result when HEAD moves,
+        so repeated dashboard renders against an unchanged repository
+        reuse the previous report for a short TTL.
+        """
+        key = (self.git_analyzer.head_sha(), days)
+        now = time.monotonic()
+        entry = self._git_cache.get(key)
+        if entry and now - entry[0] < self._GIT_CACHE_TTL:
+            return entry[1]
+        
+        report = self.git_analyzer.analyze_code_quality(days=days)
+        self._git_cache[key] = (now, report)
+        return report
+    
+    def _fetch_quality_aggregates(self, days: int) -> Tuple[int, int, Optional[float], int]:
+        """Run the window's database aggregates on one session."""
+        with get_db_session() as session:
+            since_date = date.today() - timedelta(days=days)
+            
+            # One aggregate query instead of hydrating every
+            # CodeQualityMetric row and reducing in Python. The avg
+            # mirrors the old truthiness filter: zero/NULL
+            # days_until_modification rows are excluded via case.
+            total_ai_lines, bug_fixes, avg_days = session.query(
+                func.coalesce(func.sum(CodeQualityMetric.ai_lines_original), 0),
+                func.coalesce(func.sum(
+                    case((CodeQualityMetric.modification_reason == "bug_fix", 1), else_=0)
+                ), 0),
+                func.avg(
+                    case((
+                        CodeQualityMetric.days_until_modification > 0,
+                        CodeQualityMetric.days_until_modification
+                    ))
+                )
+            ).filter(
+                CodeQualityMetric.created_at >= since_date
+            ).one()
+            
+            # PR total likewise reduces in the database
+            ai_prs_total = int(session.query(
+                func.coalesce(func.sum(DailyMetrics.ai_assisted_prs), 0)
+            ).filter(
+                DailyMetrics.date >= since_date
+            ).scalar())
+            
+            return int(total_ai_lines), int(bug_fixes), avg_days, ai_prs_total
+    
     def track_code_modification(
         self,
         repository: str,
@@ -177,29 +335,109 @@ class QualityMetricsCalculator:
             lines_modified: Lines that were modified
             modification_reason: Reason for modification
         """
+        # Buffer for a batched insert instead of paying one session
+        # and commit per tracked modification
+        with self._buffer_lock:
+            self._buffer.append({
+                "repository": repository,
+                "commit_sha": commit_sha,
+                "file_path": file_path,
+                "is_ai_generated": is_ai_generated,
+                "ai_lines_original": ai_lines_original,
+                "lines_modified": lines_modified,
+                "modification_date": date.today(),
+                "modification_reason": modification_reason
+            })
+            flush_now = len(self._buffer) >= self._FLUSH_THRESHOLD
+        
+        # New data invalidates memoized results
+        self._cache.clear()
+        
+        if flush_now:
+            self.flush()
+    
+    def track_code_modifications(self, records: List[Dict]):
+        """
+        Track many code modification events in one bulk insert.
+        
+        Args:
+            records: CodeQualityMetric column mappings; missing
+                modification_date fields default to today
+        """
+        if not records:
+            return
+        
+        today = date.today()
+        for record in records:
+            record.setdefault("modification_date", today)
+        
         try:
             with get_db_session() as session:
-                metric = CodeQualityMetric(
-                    repository=repository,
-                    commit_sha=commit_sha,
-                    file_path=file_path,
-                    is_ai_generated=is_ai_generated,
-                    ai_lines_original=ai_lines_original,
-                    lines_modified=lines_modified,
-                    modification_date=date.today(),
-                    modification_reason=modification_reason
-                )
-                session.add(metric)
-                
+                session.bulk_insert_mappings(CodeQualityMetric, records)
+                self._update_quality_buckets(session, records)
+            
+            self._cache.clear()
         except Exception as e:
-            print(f"Error tracking code modification: {e}")
+            logger.exception("Error tracking code modifications")
+    
+    @staticmethod
+    def _update_quality_buckets(session, records: List[Dict]):
+        """
+        Fold a batch of modification records into the daily buckets.
+        
+        The batch is reduced per (date, repository) first, so at most
+        one bucket row per pair is read and updated regardless of the
+        batch size.
+        """
+        deltas: Dict[Tuple[date, str], Dict[str, int]] = {}
+        for record in records:
+            key = (record["modification_date"], record["repository"])
+            delta = deltas.setdefault(key, {
+                "ai_lines": 0,
+                "modified_lines": 0,
+                "bug_fixes": 0,
+                "files_tracked": 0
+            })
+            delta["ai_lines"] += record.get("ai_lines_original", 0)
+            delta["modified_lines"] += record.get("lines_modified", 0)
+            if record.get("modification_reason") == "bug_fix":
+                delta["bug_fixes"] += 1
+            delta["files_tracked"] += 1
+        
+        for (bucket_date, repository), delta in deltas.items():
+            bucket = session.query(DailyQualityBucket).filter(
+                DailyQualityBucket.date == bucket_date,
+                DailyQualityBucket.repository == repository
+            ).first()
+            if bucket is None:
+                bucket = DailyQualityBucket(
+                    date=bucket_date,
+                    repository=repository
+                )
+                session.add(bucket)
+            
+            bucket.ai_lines = (bucket.ai_lines or 0) + delta["ai_lines"]
+            bucket.modified_lines = (bucket.modified_lines or 0) + delta["modified_lines"]
+            bucket.bug_fixes = (bucket.bug_fixes or 0) + delta["bug_fixes"]
+            bucket.files_tracked = (bucket.files_tracked or 0) + delta["files_tracked"]
+    
+    def flush(self):
+        """Write any buffered modification events to the database."""
+        with self._buffer_lock:
+            if not self._buffer:
+                return
+            batch = self._buffer
+            self._buffer = []
+        
+        self.track_code_modifications(batch)
     
-    def get_quality_trend(self, days: int = 30) -> List[Dict]:
+    def get_quality_trend(self, days: int = 30, session=None) -> List[Dict]:
         """
         Get quality metrics trend over time.
         
         Args:
             days: Number of days to include
+            session: Existing database session to reuse (optional)
             
         Returns:
             List of daily quality metrics
@@ -207,104 +445,143 @@ class QualityMetricsCalculator:
         trend = []
         
         try:
-            with get_db_session() as session:
+            with self._session_scope(session) as session:
                 since_date = date.today() - timedelta(days=days)
                 
-                daily_metrics = session.query(DailyMetrics).filter(
+                # Fetch only the four displayed columns as tuples
+                # instead of hydrating full DailyMetrics objects
+                rows = session.query(
+                    DailyMetrics.date,
+                    DailyMetrics.ai_code_lines,
+                    DailyMetrics.ai_code_modified,
+                    DailyMetrics.ai_code_retention_rate
+                ).filter(
                     DailyMetrics.date >= since_date
-                ).order_by(DailyMetrics.date).all()
+                ).order_by(
+                    DailyMetrics.date
+                ).execution_options(stream_results=True).yield_per(1000)
                 
-                for dm in daily_metrics:
+                for day, ai_lines, ai_modified, retention in rows:
                     trend.append({
-                        "date": dm.date.isoformat(),
-                        "ai_code_lines": dm.ai_code_lines,
-                        "ai_code_modified": dm.ai_code_modified,
-                        "retention_rate": dm.ai_code_retention_rate
+                        "date": day.isoformat(),
+                        "ai_code_lines": ai_lines,
+                        "ai_code_modified": ai_modified,
+                        "retention_rate": retention
                     })
         except Exception as e:
-            print(f"Error fetching quality trend: {e}")
+            logger.exception("Error fetching quality trend")
         
         return trend
     
-    def get_modification_breakdown(self, days: int = 30) -> Dict[str, int]:
+    def get_modification_breakdown(self, days: int = 30, session=None) -> Dict[str, int]:
         """
         Get breakdown of code modifications by reason.
         
         Args:
             days: Number of days to analyze
+            session: Existing database session to reuse (optional)
             
         Returns:
             Dict with modification counts by reason
         """
         breakdown = {reason: 0 for reason in self.MODIFICATION_REASONS.keys()}
         
+        self.flush()
         try:
-            with get_db_session() as session:
+            with self._session_scope(session) as session:
                 since_date = date.today() - timedelta(days=days)
                 
-                quality_records = session.query(CodeQualityMetric).filter(
+                # GROUP BY returns at most one row per reason instead
+                # of every AI-generated record
+                rows = session.query(
+                    CodeQualityMetric.modification_reason,
+                    func.count()
+                ).filter(
                     CodeQualityMetric.created_at >= since_date,
                     CodeQualityMetric.is_ai_generated == True
+                ).group_by(
+                    CodeQualityMetric.modification_reason
                 ).all()
                 
-                for record in quality_records:
-                    reason = record.modification_reason or "other"
-                    if reason in breakdown:
-                        breakdown[reason] += 1
-                    else:
-                        breakdown["other"] += 1
+                for reason, count in rows:
+                    reason = reason or "other"
+                    if reason not in self._VALID_REASONS:
+                        reason = "other"
+                    breakdown[reason] += count
                         
         except Exception as e:
-            print(f"Error fetching modification breakdown: {e}")
+            logger.exception("Error fetching modification breakdown")
         
         return breakdown
     
-    def get_repository_quality(self, days: int = 30) -> Dict[str, Dict]:
+    def get_repository_quality(self, days: int = 30, session=None) -> Dict[str, Dict]:
         """
         Get quality metrics broken down by repository.
         
         Args:
             days: Number of days to analyze
+            session: Existing database session to reuse (optional)
             
         Returns:
             Dict with repository-level quality metrics
         """
         repos = {}
         
+        self.flush()
         try:
-            with get_db_session() as session:
+            with self._session_scope(session) as session:
                 since_date = date.today() - timedelta(days=days)
                 
-                quality_records = session.query(CodeQualityMetric).filter(
-                    CodeQualityMetric.created_at >= since_date
+                # Sum the pre-aggregated daily buckets: at most one
+                # row per day and repository instead of a grouped scan
+                # over raw modification records
+                rows = session.query(
+                    DailyQualityBucket.repository,
+                    func.coalesce(func.sum(DailyQualityBucket.ai_lines), 0),
+                    func.coalesce(func.sum(DailyQualityBucket.modified_lines), 0),
+                    func.coalesce(func.sum(DailyQualityBucket.bug_fixes), 0),
+                    func.coalesce(func.sum(DailyQualityBucket.files_tracked), 0)
+                ).filter(
+                    DailyQualityBucket.date >= since_date
+                ).group_by(
+                    DailyQualityBucket.repository
                 ).all()
                 
-                for record in quality_records:
-                    repo = record.repository
-                    if repo not in repos:
-                        repos[repo] = {
-                            "total_ai_lines": 0,
-                            "modified_lines": 0,
-                            "bug_fixes": 0,
-                            "files_tracked": 0
-                        }
-                    
-                    repos[repo]["total_ai_lines"] += record.ai_lines_original
-                    repos[repo]["modified_lines"] += record.lines_modified
-                    repos[repo]["files_tracked"] += 1
-                    if record.modification_reason == "bug_fix":
-                        repos[repo]["bug_fixes"] += 1
+                # Rows tracked before the bucket table existed were
+                # never backfilled; when no bucket covers the window,
+                # fall back to grouping the raw records so pre-existing
+                # data keeps matching the overall aggregates.
+                if not rows:
+                    rows = session.query(
+                        CodeQualityMetric.repository,
+                        func.coalesce(func.sum(CodeQualityMetric.ai_lines_original), 0),
+                        func.coalesce(func.sum(CodeQualityMetric.lines_modified), 0),
+                        func.coalesce(func.sum(
+                            case((CodeQualityMetric.modification_reason == "bug_fix", 1), else_=0)
+                        ), 0),
+                        func.count()
+                    ).filter(
+                        CodeQualityMetric.created_at >= since_date
+                    ).group_by(
+                        CodeQualityMetric.repository
+                    ).all()
                 
-                # Calculate rates
+                for repo, ai_lines, modified, bug_fixes, files in rows:
+                    repos[repo] = {
+                        "total_ai_lines": int(ai_lines),
+                        "modified_lines": int(modified),
+                        "bug_fixes": int(bug_fixes),
+                        "files_tracked": files
+                    }
+                
+                # Calculate rates: integer basis points per repo,
+                # converted to two-decimal percentages at the boundary
                 for repo in repos:
                     total = repos[repo]["total_ai_lines"]
                     if total > 0:
-                        repos[repo]["modification_rate"] = round(
-                            (repos[repo]["modified_lines"] / total) * 100, 2
-                        )
-                        repos[repo]["retention_rate"] = round(
-                            100 - repos[repo]["modification_rate"], 2
-                        )
+                        modification_bp = _pct_bp(repos[repo]["modified_lines"], total)
+                        repos[repo]["modification_rate"] = modification_bp / 100
+                        repos[repo]["retention_rate"] = (10000 - modification_bp) / 100
                         repos[repo]["bug_rate"] = round(
                             (repos[repo]["bug_fixes"] / total) * 1000, 2
                         )
@@ -314,7 +591,7 @@ class QualityMetricsCalculator:
                         repos[repo]["bug_rate"] = 0
                         
         except Exception as e:
-            print(f"Error fetching repository quality: {e}")
+            logger.exception("Error fetching repository quality")
         
         return repos
     
@@ -327,40 +604,19 @@ class QualityMetricsCalculator:
         """
         metrics = self.get_quality_metrics(days=30)
         
-        kois = {
-            "code_retention_rate": {
-                "name": "Code Retention Rate",
-                "target": 85.0,
-                "current": metrics.code_retention_rate,
-                "achieved": metrics.code_retention_rate >= 85.0,
-                "unit": "%",
-                "description": "Percentage of AI code that remains unchanged"
-            },
-            "modification_rate": {
-                "name": "Modification Rate",
-                "target": 15.0,  # Lower is better
-                "current": metrics.modification_rate,
-                "achieved": metrics.modification_rate <= 15.0,
-                "unit": "%",
-                "description": "Percentage of AI code requiring changes (lower is better)"
-            },
-            "bug_rate": {
-                "name": "Bug Rate",
-                "target": 5.0,  # Lower is better
-                "current": metrics.bug_rate,
-                "achieved": metrics.bug_rate <= 5.0,
-                "unit": "per 1K LOC",
-                "description": "Bugs per 1000 lines of AI code (lower is better)"
-            },
-            "pr_success_rate": {
-                "name": "PR Success Rate",
-                "target": 90.0,
-                "current": round(100 - metrics.pr_rejection_rate, 2),
-                "achieved": (100 - metrics.pr_rejection_rate) >= 90.0,
-                "unit": "%",
-                "description": "Percentage of AI PRs merged successfully"
+        kois = {}
+        for spec in _KOI_SPEC:
+            current = getattr(metrics, spec["attr"])
+            if spec.get("invert"):
+                current = 100 - current
+            kois[spec["key"]] = {
+                "name": spec["name"],
+                "target": spec["target"],
+                "current": round(current, 2),
+                "achieved": spec["op"](current, spec["target"]),
+                "unit": spec["unit"],
+                "description": spec["description"]
             }
-        }
         
         return kois
 